@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+
+'''
+Measures the cost of the robot program's main loop by running it headless
+against stubbed hardware. Two scenarios are run: driving with scripted joystick
+input, and an autonomous chain of moves and turns. For each, the latency of
+the loop, the memory allocated during each loop and the CAN calls made per loop
+are reported.
+
+Allocations are the number of memory blocks allocated during a loop that are
+still alive at its end, from the difference of tracemalloc snapshots taken
+before and after it. Objects created and freed within the loop are not
+counted, but they still show up in the peak bytes allocated.
+
+usage:
+    ./benchmark.py                    print results
+    ./benchmark.py --save [FILE]      also store them as a baseline
+    ./benchmark.py --compare [FILE]   fail if results are worse than a baseline
+
+FILE defaults to benchmark-baseline.json. Save a new baseline whenever a change
+is meant to alter these numbers, and commit it with the change.
+'''
+
+import json, math, os, sys, tracemalloc
+
+from sim.harness import SimulatedRobot
+
+baselinePath = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    'benchmark-baseline.json'
+)
+
+'''
+How much worse than the baseline each metric may be before failing, as a
+ratio and as an absolute amount. Both must be exceeded, so that noise in very
+small numbers, such as latencies of a tenth of a millisecond, is not reported.
+'''
+tolerances = {
+    'latencyP50Ms': (1.25, 0.25),
+    'latencyP99Ms': (1.5, 1.0),
+    'allocationsPerTick': (1.25, 2),
+    'peakBytesPerTick': (1.25, 512),
+    'canWritesPerTick': (1.01, 0.01),
+    'canReadsPerTick': (1.01, 0.01),
+}
+
+
+def runTeleop(sim):
+    '''Drive with smoothly varying joystick input for ten seconds.'''
+
+    sim.setAxes(
+        driveX=lambda t: 0,
+        driveY=lambda t: math.sin(t),
+        driveRotate=lambda t: 0.5 * math.sin(0.7 * t)
+    )
+
+    return [sim.tick for i in range(500)]
+
+
+def runAutonomous(sim):
+    '''Run a chain of encoder based moves and turns, up to fifteen seconds.'''
+
+    from wpilib.command import CommandGroup
+    from commands.drivetrain.movecommand import MoveCommand
+    from commands.drivetrain.turncommand import TurnCommand
+    from commands.drivetrain.pivotcommand import PivotCommand
+
+    sim.setAxes(driveX=lambda t: 0, driveY=lambda t: 0, driveRotate=lambda t: 0)
+
+    auton = CommandGroup('Benchmark Autonomous')
+    auton.addSequential(MoveCommand(36))
+    auton.addSequential(TurnCommand(90))
+    auton.addSequential(MoveCommand(-36))
+    auton.addSequential(PivotCommand(45))
+    auton.start()
+    startTime = sim.clock.now()
+
+    def tick():
+        '''The group does not start running until the scheduler's next pass.'''
+        if auton.isRunning() or sim.clock.now() - startTime < 0.1:
+            return sim.tick()
+
+        return None
+
+    return [tick for i in range(750)]
+
+
+def measure(sim, scenario):
+    '''
+    Run the scenario twice, once for timing and once with tracemalloc enabled
+    to measure allocations, and summarize the results.
+    '''
+
+    latencies = []
+    startWrites = sim.getCANWrites()
+    startReads = sim.getCANReads()
+    for tick in scenario(sim):
+        duration = tick()
+        if duration is None:
+            break
+
+        latencies.append(duration)
+
+    ticks = len(latencies)
+    canWrites = sim.getCANWrites() - startWrites
+    canReads = sim.getCANReads() - startReads
+
+    '''Leave out the memory used by the snapshots themselves.'''
+    ignoreSnapshots = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    peaks = []
+    allocations = []
+    tracemalloc.start()
+    for tick in scenario(sim):
+        before = tracemalloc.take_snapshot().filter_traces(ignoreSnapshots)
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        if tick() is None:
+            break
+
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+
+        after = tracemalloc.take_snapshot().filter_traces(ignoreSnapshots)
+        allocations.append(sum(
+            max(stat.count_diff, 0)
+            for stat in after.compare_to(before, 'lineno')
+        ))
+
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'ticks': ticks,
+        'latencyP50Ms': latencies[ticks // 2] * 1000,
+        'latencyP99Ms': latencies[min(int(ticks * 0.99), ticks - 1)] * 1000,
+        'latencyMaxMs': latencies[-1] * 1000,
+        'allocationsPerTick': sum(allocations) / max(len(allocations), 1),
+        'peakBytesPerTick': sum(peaks) / max(len(peaks), 1),
+        'canWritesPerTick': canWrites / ticks,
+        'canReadsPerTick': canReads / ticks,
+    }
+
+
+def compare(results, baseline):
+    '''Returns a description of each metric that is worse than the baseline.'''
+
+    regressions = []
+    for scenario, metrics in baseline.items():
+        for metric, (ratio, slack) in tolerances.items():
+            old = metrics.get(metric)
+            new = results.get(scenario, {}).get(metric)
+            if old is None or new is None:
+                continue
+
+            if new > old * ratio and new - old > slack:
+                regressions.append('%s %s: %.3f, baseline %.3f' % (
+                    scenario,
+                    metric,
+                    new,
+                    old
+                ))
+
+    return regressions
+
+
+if __name__ == '__main__':
+    sim = SimulatedRobot()
+    results = {
+        'teleop': measure(sim, runTeleop),
+        'autonomous': measure(sim, runAutonomous),
+    }
+
+    print(json.dumps(results, indent=4, sort_keys=True))
+
+    command = sys.argv[1] if 1 < len(sys.argv) <= 3 else None
+    path = sys.argv[2] if len(sys.argv) == 3 else baselinePath
+
+    if command == '--save':
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=4, sort_keys=True)
+
+    elif command == '--compare':
+        with open(path) as f:
+            regressions = compare(results, json.load(f))
+
+        for regression in regressions:
+            print('\033[91mRegression: %s\033[0m' % regression)
+
+        if regressions:
+            sys.exit(1)
+
+    elif len(sys.argv) > 1:
+        print(__doc__.strip())
+        sys.exit(2)
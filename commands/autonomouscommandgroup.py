@@ -1,7 +1,7 @@
 import commandbased.flowcontrol as fc
 
 
-class AutonomousCommandGroup(fc.CommandFlow):
+class AutonomousCommandGroup(fc.CommandGroup):
 
     def __init__(self):
         super().__init__('Autonomous')
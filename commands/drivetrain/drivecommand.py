@@ -4,7 +4,6 @@ import robot
 from controller import logicalaxes
 from custom.config import Config, MissingConfigError
 from custom import driverhud
-import math
 
 logicalaxes.registerAxis('driveX')
 logicalaxes.registerAxis('driveY')
@@ -28,25 +27,14 @@ class DriveCommand(Command):
             driverhud.showAlert('Drive Train is not configured')
             robot.drivetrain.enableSimpleDriving()
 
-        self.lastY = None
-        self.slowed = False
-
 
     def execute(self):
-        # Avoid quick changes in direction
+        '''
+        Quick changes in direction are filtered out of driveY by the
+        controller layout.
+        '''
+
         y = logicalaxes.driveY.get()
-        if self.lastY is None:
-            self.lastY = y
-        else:
-            cooldown = 0.05
-            self.lastY -= math.copysign(cooldown, self.lastY)
-
-            # If the sign has changed, don't move
-            if self.lastY * y < 0:
-                y = 0
-
-            if abs(y) > abs(self.lastY):
-                self.lastY = y
 
         tilt = robot.drivetrain.getTilt()
         correction = tilt / 20
@@ -0,0 +1,83 @@
+from wpilib.command import Command
+
+import robot
+from custom import trajectory
+from custom.config import Config
+
+
+class FollowTrajectoryCommand(Command):
+    '''
+    Drives along a path through the given waypoints without stopping. See
+    custom.trajectory for how waypoints are described. The path is planned, or
+    loaded from the cache, when the command is created, so that commands built
+    in robotInit do their planning before the match. It is looked up again each
+    time the command starts, in case the limits in Config have changed since.
+    A path is only planned once for each set of limits.
+    '''
+
+    def __init__(self, waypoints, name=None):
+        if name is None:
+            name = 'Follow %d waypoints' % len(waypoints)
+
+        super().__init__(name)
+
+        self.requires(robot.drivetrain)
+
+        '''Correction in degrees per second for each degree of heading error.'''
+        self.headingP = Config('DriveTrain/headingP', 2)
+        self.maxSpeed = Config('DriveTrain/maxSpeed')
+        self.accelerationTime = Config('DriveTrain/accelerationTime', 0.5)
+        self.width = Config('DriveTrain/width')
+
+        self.waypoints = waypoints
+
+        '''The limits cannot be derived until the drive has been measured.'''
+        try:
+            self.trajectory = trajectory.load(waypoints, *self._getLimits())
+        except ZeroDivisionError:
+            pass
+
+
+    def initialize(self):
+        self.trajectory = trajectory.load(self.waypoints, *self._getLimits())
+
+        robot.drivetrain.setProfile(0)
+        self.startAngle = robot.drivetrain.sensors.getAngle()
+        self.startHeading = self.trajectory.headings[0]
+
+
+    def execute(self):
+        velocity, rotate, heading = self.trajectory.sample(
+            self.timeSinceInitialized()
+        )
+
+        '''Steer back toward the planned heading if we have drifted.'''
+        target = self.startAngle + heading - self.startHeading
+        error = target - robot.drivetrain.sensors.getAngle()
+        rotate += error * self.headingP.f
+
+        robot.drivetrain.setChassisVelocity(velocity, rotate)
+
+
+    def isFinished(self):
+        return self.timeSinceInitialized() >= self.trajectory.getDuration()
+
+
+    def end(self):
+        robot.drivetrain.setChassisVelocity(0, 0)
+
+
+    def _getLimits(self):
+        '''
+        Derive the velocity and acceleration limits in inches from Config. Max
+        speed is stored in encoder ticks per 100 ms.
+        '''
+
+        ticksPerInch = robot.drivetrain.ticksPerInch.get()
+        maxVelocity = self.maxSpeed.f * 10 / ticksPerInch
+
+        return (
+            maxVelocity,
+            maxVelocity / self.accelerationTime.f,
+            self.width.f
+        )
@@ -1,8 +1,11 @@
 from wpilib.command import Command
 from custom import driverhud
 from custom.config import MissingConfigError
+from custom.settledetector import SettleDetector
 import robot
 
+import math
+
 class MoveCommand(Command):
 
     def __init__(self, distance, avoidCollisions=True, name=None):
@@ -14,27 +17,33 @@ class MoveCommand(Command):
         if name is None:
             name = 'Move %f inches' % distance
 
-        super().__init__(name, 0.2)
+        super().__init__(name)
 
         self.distance = distance
         self.blocked = False
         self.avoidCollisions = avoidCollisions
+        self.settle = SettleDetector()
         self.requires(robot.drivetrain)
 
 
     def _initialize(self):
         super()._initialize()
         self.precision = robot.drivetrain.inchesToTicks(1)
+        self.settle.reset()
 
 
     def initialize(self):
-        self.obstacleCount = 0
+        '''
+        Offsets are measured from where the previous move was headed, so a
+        move that starts before the last one has stopped still ends up in the
+        right place.
+        '''
+
         self.blocked = False
-        self.onTarget = 0
         self.targetPositions = []
         offset = robot.drivetrain.inchesToTicks(self.distance)
         sign = 1
-        for position in robot.drivetrain.getPositions():
+        for position in robot.drivetrain.getTargetPositions():
             self.targetPositions.append(position + offset * sign)
             sign *= -1
 
@@ -42,48 +51,62 @@ class MoveCommand(Command):
 
 
     def execute(self):
-        if self.avoidCollisions:
-            try:
-                if self.distance < 0:
-                    clearance = robot.drivetrain.getRearClearance()
-                else:
-                    clearance = robot.drivetrain.getFrontClearance()
-
-                if not self.blocked:
-                    if clearance < 10:
-                        if self.obstacleCount >= 10:
-                            self.blocked = True
-                            self.obstacleCount = 0
-                            robot.drivetrain.stop()
-                            robot.drivetrain.move(0, 0, 0)
-                            driverhud.showAlert('Obstacle Detected')
-                        else:
-                            self.obstacleCount += 1
-                    else:
-                        self.obstacleCount = 0
-
-                else:
-                    if clearance >= 20:
-                        if self.obstacleCount >= 10:
-                            self.blocked = False
-                            self.obstacleCount = 0
-                            robot.drivetrain.setPositions(self.targetPositions)
-                        else:
-                            self.obstacleCount += 1
-                    else:
-                        self.obstacleCount = 0
-
-            except NotImplementedError:
-                pass
+        '''
+        Slow down smoothly as an obstacle gets close. The cap is rounded to a
+        twentieth of the speed limit so the Talons are only reconfigured when
+        it changes noticeably. Once the cap rounds to zero the robot stops,
+        and the move resumes when the obstacle is gone.
+        '''
+
+        if not self.avoidCollisions:
+            return
+
+        sensors = robot.rangesensors
+        direction = 'rear' if self.distance < 0 else 'front'
+        if not sensors.hasSensor(direction):
+            return
+
+        drivetrain = robot.drivetrain
+        speedLimit = float(drivetrain.speedLimit)
+        cap = sensors.getSpeedCap(direction, drivetrain.getForwardSpeed())
+        cap *= drivetrain.ticksPerInch.get() / 10
+
+        '''The cap is infinite while nothing is in range.'''
+        if not math.isfinite(cap):
+            cap = speedLimit
+
+        step = speedLimit / 20
+        cap = math.floor(min(cap, speedLimit) / step) * step
+
+        blocked = cap < step
+        if blocked:
+            if not self.blocked:
+                driverhud.showAlert('Obstacle Detected')
+                drivetrain.setChassisVelocity(0, 0)
+
+        else:
+            if self.blocked:
+                drivetrain.setPositions(self.targetPositions)
+
+            drivetrain.setCruiseVelocity(cap)
+
+        self.blocked = blocked
 
 
     def isFinished(self):
+        '''
+        Compare against this move's own targets. The drive's targets are
+        cleared while blocked, and then read back as the current positions.
+        '''
+
         if self.blocked:
             return False
 
-        if self.isTimedOut() and robot.drivetrain.atPosition(self.precision):
-            self.onTarget += 1
-        else:
-            self.onTarget = 0
+        drivetrain = robot.drivetrain
 
-        return self.onTarget > 5
+        return self.settle.update(
+            self.targetPositions,
+            drivetrain.getPositions(),
+            drivetrain.getSpeeds(),
+            self.precision
+        )
@@ -28,12 +28,12 @@ class PivotCommand(TurnCommand):
         '''Calculates new positions by offsetting the current ones.'''
 
         offset = self._calculateDisplacement() * 2
-        targetPositions = []
-        for i, position in enumerate(robot.drivetrain.getPositions()):
+        self.targetPositions = []
+        for i, position in enumerate(robot.drivetrain.getTargetPositions()):
             side = i % 2
             if self.pivotSide == side:
                 position += offset
 
-            targetPositions.append(position)
+            self.targetPositions.append(position)
 
-        robot.drivetrain.setPositions(targetPositions)
+        robot.drivetrain.setPositions(self.targetPositions)
@@ -1,23 +1,24 @@
-from .pivotcommand import PivotCommand
+from .turntocommand import TurnToCommand
 
 import robot
 
-class PivotToCommand(PivotCommand):
-    '''Pivot to a specified angle using the gyroscope.'''
+class PivotToCommand(TurnToCommand):
+    '''
+    Pivot to a specified angle using the gyroscope, turning around one side of
+    the robot while its wheels stay still.
+    '''
 
     def __init__(self, targetDegrees, reverse=False):
         super().__init__(
             targetDegrees,
-            reverse,
             'Pivot to %f degrees' % targetDegrees
         )
 
-        self.targetDegrees = targetDegrees
         self.reversed = reverse
 
 
     def initialize(self):
-        self.distance = robot.drivetrain.getAngleTo(self.targetDegrees)
+        super().initialize()
 
         # 0 = Left Side, 1 = Right Side
         self.pivotSide = 0
@@ -27,4 +28,21 @@ class PivotToCommand(PivotCommand):
         if self.reversed:
             self.pivotSide = abs(self.pivotSide - 1)
 
-        super().initialize()
+
+    def _calculateForward(self, rate):
+        '''
+        Drive forward or back by exactly as much as one side turns, so that
+        side stands still. Turning clockwise moves the left side forward.
+        '''
+
+        drivetrain = robot.drivetrain
+        forward = (
+            rate
+            * drivetrain.ticksPerDegree.get()
+            / drivetrain.ticksPerInch.get()
+        )
+
+        if self.pivotSide == 0:
+            return forward
+
+        return -forward
@@ -1,9 +1,6 @@
 from .movecommand import MoveCommand
 
 import robot
-from custom.config import Config
-
-import math
 
 
 class TurnCommand(MoveCommand):
@@ -20,21 +17,14 @@ class TurnCommand(MoveCommand):
         '''Calculates new positions by offseting the current ones.'''
 
         offset = self._calculateDisplacement()
-        targetPositions = []
-        for position in robot.drivetrain.getPositions():
-            targetPositions.append(position + offset)
+        self.targetPositions = []
+        for position in robot.drivetrain.getTargetPositions():
+            self.targetPositions.append(position + offset)
 
-        robot.drivetrain.setPositions(targetPositions)
+        robot.drivetrain.setPositions(self.targetPositions)
 
 
     def _calculateDisplacement(self):
-        '''
-        In order to avoid having a separate ticksPerDegree, we calculate it
-        based on the width of the robot base.
-        '''
-
-        inchesPerDegree = math.pi * Config('DriveTrain/width') / 360
-        totalDistanceInInches = self.distance * inchesPerDegree
-        ticks = robot.drivetrain.inchesToTicks(totalDistanceInInches)
+        '''How far each wheel must travel to turn the requested angle.'''
 
-        return ticks * Config('DriveTrain/slip', 1.2)
+        return robot.drivetrain.degreesToTicks(self.distance)
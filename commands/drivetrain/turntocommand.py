@@ -1,20 +1,79 @@
-from .turncommand import TurnCommand
+from wpilib.command import Command
+from wpilib import Timer
 
 import robot
+from custom.headingcontroller import HeadingController
 
-class TurnToCommand(TurnCommand):
-    '''Turn to a specified angle using the gyroscope.'''
+class TurnToCommand(Command):
+    '''
+    Turn to a specified angle using the gyroscope. The navX is checked every
+    loop, so wheel slip does not cause the turn to miss, although the turn
+    rate is still converted to wheel speeds using DriveTrain/slip.
+    '''
 
-    def __init__(self, targetDegrees):
-        super().__init__(
-            targetDegrees,
-            'Turn to %f degrees' % targetDegrees
-        )
+    def __init__(self, targetDegrees, name=None):
+        if name is None:
+            name = 'Turn to %f degrees' % targetDegrees
+
+        super().__init__(name)
 
+        self.requires(robot.drivetrain)
         self.targetDegrees = targetDegrees
+        self.controller = HeadingController()
 
 
     def initialize(self):
-        self.distance = robot.drivetrain.getAngleTo(self.targetDegrees)
+        '''
+        The navX angle is continuous, so the target is found by adding the
+        shortest turn to it.
+        '''
+
+        drivetrain = robot.drivetrain
+        drivetrain.setProfile(0)
+
+        angle = drivetrain.sensors.getAngle()
+        self.distance = drivetrain.getAngleTo(self.targetDegrees)
+        self.controller.start(
+            angle,
+            angle + self.distance,
+            drivetrain.getYawRate()
+        )
+        self.lastTime = Timer.getFPGATimestamp()
+
+
+    def execute(self):
+        drivetrain = robot.drivetrain
+        now = Timer.getFPGATimestamp()
+        dt = now - self.lastTime
+        self.lastTime = now
+
+        rate = self.controller.calculate(
+            drivetrain.sensors.getAngle(),
+            drivetrain.getYawRate(),
+            dt
+        )
+
+        drivetrain.setChassisVelocity(self._calculateForward(rate), rate)
+
+
+    def isFinished(self):
+        drivetrain = robot.drivetrain
+
+        return self.controller.isFinished(
+            drivetrain.sensors.getAngle(),
+            drivetrain.getYawRate()
+        )
+
+
+    def end(self):
+        robot.drivetrain.stop()
+
+
+    def interrupted(self):
+        self.end()
+
+
+    def _calculateForward(self, rate):
+        '''Forward speed to add to the turn, in inches per second.'''
 
-        super().initialize()
+        return 0
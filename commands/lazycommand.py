@@ -0,0 +1,44 @@
+from wpilib.command import Command
+
+
+class LazyCommand(Command):
+    '''
+    Stands in for a command that is expensive to build and may never be used,
+    such as a tool shown on the dashboard. The real command is built the first
+    time this one runs, and is then started in its place. This command keeps
+    running until the real one finishes, and cancelling it cancels the real one.
+    '''
+
+    def __init__(self, name, factory):
+        '''The factory is called with no arguments to build the real command.'''
+
+        super().__init__(name)
+
+        self.factory = factory
+        self.command = None
+
+
+    def initialize(self):
+        if self.command is None:
+            self.command = self.factory()
+
+        self.started = False
+        self.command.start()
+
+
+    def isFinished(self):
+        '''
+        The real command does not run until the scheduler's next pass, so wait
+        for it to start before watching for it to finish. If it never starts,
+        because a subsystem it needs is busy, give up after a second.
+        '''
+
+        if self.command.isRunning():
+            self.started = True
+            return False
+
+        return self.started or self.timeSinceInitialized() > 1
+
+
+    def interrupted(self):
+        self.command.cancel()
@@ -0,0 +1,87 @@
+from wpilib.command import Command
+from wpilib import Timer
+import json
+
+import robot
+from custom import driverhud, ntpublisher, pidtuning
+from custom.logs import getLogPath
+
+
+class AutoTunePIDCommand(Command):
+    '''
+    Applies a step of percent output to the drive and records how its speed
+    responds. A first order plus dead time model is fitted to the response, and
+    F, P, I, D and IZone for both Talon profiles are calculated from it and
+    written to the DriveTrain/Speed and DriveTrain/Position tables. The
+    response is also saved to the log directory, so it can be refined offline
+    with custom.pidtuning.
+    '''
+
+    def __init__(self, output=0.5, duration=1.5):
+        super().__init__('Auto Tune PID', duration)
+
+        self.requires(robot.drivetrain)
+        self.output = output
+
+
+    def initialize(self):
+        self.times = []
+        self.velocities = []
+        self.start = Timer.getFPGATimestamp()
+
+        robot.drivetrain.setPercentOutput(self.output)
+
+
+    def execute(self):
+        '''Record the drive's forward speed, in ticks per 100 ms.'''
+
+        drivetrain = robot.drivetrain
+        x, y, rotate = drivetrain.kinematics.toChassisSpeeds(
+            drivetrain.getSpeeds()
+        )
+
+        self.times.append(Timer.getFPGATimestamp() - self.start)
+        self.velocities.append(y)
+
+
+    def isFinished(self):
+        return self.isTimedOut()
+
+
+    def end(self):
+        robot.drivetrain.stop()
+
+        try:
+            model = pidtuning.fitFirstOrder(
+                self.times,
+                self.velocities,
+                self.output
+            )
+        except ValueError as e:
+            driverhud.showAlert('Auto tune failed: %s' % e)
+            return
+
+        print('Drive response: %s' % model)
+        self._save()
+
+        for name, gains in pidtuning.calculateGains(model).items():
+            for key, value in gains.items():
+                ntpublisher.put('DriveTrain/%s' % name, key, value)
+
+            print('%s gains: %s' % (name, gains))
+
+
+    def interrupted(self):
+        robot.drivetrain.stop()
+
+
+    def _save(self):
+        try:
+            with open(getLogPath('step', 'json'), 'w') as f:
+                json.dump({
+                    'output': self.output,
+                    'times': self.times,
+                    'velocities': self.velocities,
+                }, f)
+        except OSError as e:
+            print('Could not save step response: %s' % e)
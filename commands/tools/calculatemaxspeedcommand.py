@@ -1,8 +1,8 @@
 from wpilib.command import InstantCommand
-from networktables import NetworkTables
 import math
 
 import robot
+from custom import ntpublisher
 
 class CalculateMaxSpeedCommand(InstantCommand):
 
@@ -12,7 +12,6 @@ class CalculateMaxSpeedCommand(InstantCommand):
         super().__init__('Calculate Max Speed')
 
         self.requires(robot.drivetrain)
-        self.table = NetworkTables.getTable('DriveTrain')
 
 
     def initialize(self):
@@ -22,8 +21,10 @@ class CalculateMaxSpeedCommand(InstantCommand):
         # Select the smallest max speed
         maxSpeed = min(self.measuredSpeeds)
 
-        self.table.putValue('maxSpeed', math.floor(maxSpeed))
-        self.table.putValue('normalSpeed', round(maxSpeed * 0.7))
-        self.table.putValue('preciseSpeed', round(maxSpeed * 0.3))
+        ntpublisher.put('DriveTrain', 'maxSpeed', math.floor(maxSpeed))
+        ntpublisher.put('DriveTrain', 'normalSpeed', round(maxSpeed * 0.7))
+        ntpublisher.put('DriveTrain', 'preciseSpeed', round(maxSpeed * 0.3))
 
-        self.table.putValue('Speed/F', 1023 / maxSpeed)
+        '''Velocity and Motion Magic both use F, and have their own profiles.'''
+        ntpublisher.put('DriveTrain/Speed', 'F', 1023 / maxSpeed)
+        ntpublisher.put('DriveTrain/Position', 'F', 1023 / maxSpeed)
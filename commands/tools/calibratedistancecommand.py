@@ -0,0 +1,52 @@
+from commands.drivetrain.runintowallcommand import RunIntoWallCommand
+
+import robot
+
+
+class CalibrateDistanceCommand(RunIntoWallCommand):
+    '''
+    Measures the wheel diameter. Place the robot facing a wall, with its
+    bumper the given number of inches away, and run this command. The robot
+    drives slowly until it hits the wall, and the encoder distance is recorded
+    as a calibration run for the drive train's wheel diameter estimate.
+    '''
+
+    def __init__(self, distance, speed=0.3, timelimit=10):
+        super().__init__(timelimit, 'Calibrate Distance %f inches' % distance)
+
+        self.distance = distance
+        self.speed = speed
+
+
+    def initialize(self):
+        self.start = self._getForwardTicks()
+
+        robot.drivetrain.setProfile(0)
+        robot.drivetrain.move(0, self.speed, 0)
+
+
+    def end(self):
+        super().end()
+
+        '''A run that timed out did not reach the wall.'''
+        if self.isTimedOut():
+            return
+
+        ticks = self._getForwardTicks() - self.start
+        robot.odometry.calibration.addRun(ticks, self.distance)
+        robot.odometry.calibration.publish()
+
+
+    def interrupted(self):
+        '''A cancelled run did not reach the wall, so it is not recorded.'''
+
+        super().end()
+
+
+    def _getForwardTicks(self):
+        drivetrain = robot.drivetrain
+        x, y, rotate = drivetrain.kinematics.toChassisSpeeds(
+            drivetrain.getPositions()
+        )
+
+        return y
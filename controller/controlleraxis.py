@@ -1,13 +1,24 @@
+
 class ControllerAxis:
     '''Represents an axis of a joystick.'''
 
-    def __init__(self, controller, id, isInverted):
+    def __init__(self, controller, id):
         '''
-        An axis is considered inverted if pushing up gives a negative result.
-        In that case, we multiply its value by -1 before returning it.
+        The controller takes care of inverting axes where pushing up gives a
+        negative result, and of running any filters added to the axis.
         '''
 
-        if isInverted:
-            self.get = lambda: -1 * controller.getRawAxis(id)
-        else:
-            self.get = lambda: controller.getRawAxis(id)
+        self.controller = controller
+        self.id = id
+
+
+    def get(self):
+        return self.controller.axes[self.id]
+
+
+    def addFilter(self, stage):
+        '''Add a filter stage from controller.filters. Returns the axis.'''
+
+        self.controller.addFilter(self.id, stage)
+
+        return self
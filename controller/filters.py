@@ -0,0 +1,84 @@
+'''
+Filter stages for controller axes. Each stage is called once per loop with
+the axis value and the seconds since the previous loop, and returns the new
+value. Add stages to an axis in layout.py, for example:
+
+    driveController.LeftY.addFilter(Deadband(0.05)).addFilter(Expo(0.3))
+'''
+
+import math
+
+
+class Deadband:
+    '''
+    Ignore small movements around the center, and rescale the rest so the
+    output still starts at zero and reaches full scale.
+    '''
+
+    def __init__(self, width):
+        self.width = width
+
+
+    def __call__(self, value, dt):
+        magnitude = abs(value)
+        if magnitude < self.width:
+            return 0.0
+
+        return math.copysign(
+            (magnitude - self.width) / (1 - self.width),
+            value
+        )
+
+
+class Expo:
+    '''
+    Soften the response near the center for finer control. An amount of 0 is
+    linear and 1 is fully cubic.
+    '''
+
+    def __init__(self, amount):
+        self.amount = amount
+
+
+    def __call__(self, value, dt):
+        return self.amount * value ** 3 + (1 - self.amount) * value
+
+
+class SlewRateLimiter:
+    '''Limit how quickly the value can change, in full scales per second.'''
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.value = 0.0
+
+
+    def __call__(self, value, dt):
+        change = self.rate * dt
+        self.value += max(-change, min(change, value - self.value))
+
+        return self.value
+
+
+class DirectionLockout:
+    '''
+    Avoid quick changes in direction. The largest recent value is remembered
+    and decays toward zero at the given rate, in full scales per second. While
+    it has not yet decayed, input in the opposite direction reads as zero.
+    '''
+
+    def __init__(self, decay=2.5):
+        self.decay = decay
+        self.memory = 0.0
+
+
+    def __call__(self, value, dt):
+        change = min(self.decay * dt, abs(self.memory))
+        self.memory -= math.copysign(change, self.memory)
+
+        if self.memory * value < 0:
+            return 0.0
+
+        if abs(value) > abs(self.memory):
+            self.memory = value
+
+        return value
@@ -1,11 +1,33 @@
-from wpilib import Joystick
+from wpilib import Joystick, Timer
 from wpilib.buttons import JoystickButton
 
+from array import array
+
 from .controlleraxis import ControllerAxis
 from .povbutton import POVButton
 
+'''Every controller that has been created, so they can be updated together.'''
+controllers = []
+
+
+def updateAll():
+    '''
+    Read the state of every controller. This should be called once at the
+    start of each loop, before any buttons or axes are checked.
+    '''
+
+    now = Timer.getFPGATimestamp()
+    for controller in controllers:
+        controller.update(now)
+
+
 class GenericController(Joystick):
-    '''The base class for all controllers.'''
+    '''
+    The base class for all controllers. The controller's axes, buttons and
+    DPad are read from the driver station once per loop by update(), and
+    getRawAxis, getRawButton and getPOV return those readings, so every button
+    and axis sees the same state no matter how often it is checked.
+    '''
 
     namedButtons = {}
     namedAxes = {}
@@ -20,18 +42,81 @@ class GenericController(Joystick):
 
         super().__init__(port)
 
+        axisCount = max(self.namedAxes.values(), default=-1) + 1
+        self.rawAxes = array('d', [0.0] * axisCount)
+
+        '''Axis values after inversion and filtering.'''
+        self.axes = array('d', [0.0] * axisCount)
+        self.directions = array('d', [1.0] * axisCount)
+        self.filters = [[] for id in range(axisCount)]
+
+        self.buttons = 0
+        self.pov = -1
+        self.lastUpdate = None
+
         for name, id  in self.namedButtons.items():
             if id >= 20:
                 '''
                 By convention, the DPad buttons are 20 through 23 and can be
                 converted to POV angles by the formula below.
                 '''
-                
+
                 angle = (id - 20) * 90
                 self.__dict__[name] = POVButton(self, angle)
             else:
                 self.__dict__[name] = JoystickButton(self, id)
 
         for name, id in self.namedAxes.items():
-            isInverted = name in self.invertedAxes
-            self.__dict__[name] = ControllerAxis(self, id, isInverted)
+            if name in self.invertedAxes:
+                self.directions[id] = -1.0
+
+            self.__dict__[name] = ControllerAxis(self, id)
+
+        controllers.append(self)
+
+
+    def addFilter(self, id, stage):
+        '''
+        Add a filter stage to an axis. Stages run in the order they are added,
+        each receiving the output of the one before.
+        '''
+
+        self.filters[id].append(stage)
+
+
+    def update(self, now):
+        '''Read the controller's state and run each axis's filters.'''
+
+        dt = 0 if self.lastUpdate is None else now - self.lastUpdate
+        self.lastUpdate = now
+
+        for id in range(len(self.rawAxes)):
+            raw = super().getRawAxis(id)
+            self.rawAxes[id] = raw
+
+            value = raw * self.directions[id]
+            for stage in self.filters[id]:
+                value = stage(value, dt)
+
+            self.axes[id] = value
+
+        self.buttons = self.ds.getStickButtons(self.getPort())
+        self.pov = super().getPOV(0)
+
+
+    def getRawAxis(self, axis):
+        if axis < len(self.rawAxes):
+            return self.rawAxes[axis]
+
+        return super().getRawAxis(axis)
+
+
+    def getRawButton(self, button):
+        return bool((self.buttons >> (button - 1)) & 1)
+
+
+    def getPOV(self, pov=0):
+        if pov == 0:
+            return self.pov
+
+        return super().getPOV(pov)
@@ -1,5 +1,6 @@
 from .logitechdualshock import LogitechDualShock
 from . import logicalaxes
+from .filters import DirectionLockout
 
 from custom.config import Config
 
@@ -22,7 +23,7 @@ def init():
     driveController = LogitechDualShock(0)
 
     logicalaxes.driveX = driveController.LeftX
-    logicalaxes.driveY = driveController.LeftY
+    logicalaxes.driveY = driveController.LeftY.addFilter(DirectionLockout())
     logicalaxes.driveRotate = driveController.RightX
 
     driveController.Back.whenPressed(ResetCommand())
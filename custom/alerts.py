@@ -0,0 +1,101 @@
+'''
+Collects text notifications for the dashboard. Alerts are kept in memory and
+sent to SmartDashboard at most once per loop, rather than every time one is
+raised. Each alert is shown with its severity, such as "[ERROR] Fatal Error".
+Repeated alerts are combined and shown with a count, and each channel only
+holds a limited number of alerts, so publishing does not get slower as a match
+goes on.
+'''
+
+from collections import OrderedDict
+
+from . import ntpublisher
+
+INFO = 0
+WARNING = 1
+ERROR = 2
+
+'''How each severity is labelled on the dashboard.'''
+severityNames = {
+    INFO: 'INFO',
+    WARNING: 'WARNING',
+    ERROR: 'ERROR',
+}
+
+'''How many alerts each channel keeps.'''
+maxAlerts = 20
+
+channels = {}
+
+
+class AlertChannel:
+    '''The alerts shown under one SmartDashboard key, oldest first.'''
+
+    def __init__(self, key):
+        self.key = key
+        self.alerts = OrderedDict()
+        self.changed = False
+
+
+    def add(self, msg, severity):
+        '''
+        Add an alert, or move it to the end and increase its count if it is
+        already shown. When the channel is full, the oldest alert of the lowest
+        severity is removed to make room, so the new alert is always shown.
+        '''
+
+        count = 0
+        if msg in self.alerts:
+            count, oldSeverity = self.alerts.pop(msg)
+            severity = max(severity, oldSeverity)
+
+        elif len(self.alerts) >= maxAlerts:
+            self._evict()
+
+        self.alerts[msg] = (count + 1, severity)
+        self.changed = True
+
+
+    def _evict(self):
+        '''Remove the oldest of the alerts with the lowest severity.'''
+
+        lowest = min(severity for count, severity in self.alerts.values())
+        for msg, (count, severity) in self.alerts.items():
+            if severity == lowest:
+                del self.alerts[msg]
+                return
+
+
+    def publish(self):
+        if not self.changed:
+            return
+
+        messages = []
+        for msg, (count, severity) in self.alerts.items():
+            msg = '[%s] %s' % (severityNames[severity], msg)
+            if count > 1:
+                msg = '%s (x%d)' % (msg, count)
+
+            messages.append(msg)
+
+        ntpublisher.put('SmartDashboard', self.key, messages, 'putStringArray')
+        self.changed = False
+
+
+def add(msg, channel, severity=WARNING):
+    '''Queue an alert to be shown on the next publish().'''
+
+    if channel not in channels:
+        channels[channel] = AlertChannel(channel)
+
+    channels[channel].add(msg, severity)
+
+
+def publish():
+    '''
+    Send changed channels to the dashboard. This is called once per loop by
+    the robot, and directly when the loop may not run again.
+    '''
+
+    for channel in channels.values():
+        channel.publish()
@@ -0,0 +1,140 @@
+'''
+Estimates the drive train's slip factor and effective wheel diameter while the
+robot runs, so they keep up with tread wear without being measured by hand.
+
+Slip is estimated from every loop in which the robot turns: the rotation the
+encoders report, before the current slip factor is applied, is compared with
+the change in navX heading. Wheel diameter is estimated from calibration runs
+of known length, such as CalibrateDistanceCommand.
+
+Both are fitted with recursive least squares. Once an estimate is confident,
+and differs noticeably from the value in use, it is written to DriveTrain/slip
+or DriveTrain/wheelDiameter, unless DriveTrain/autoCalibrate is false. Current
+estimates are published to the Calibration table either way.
+'''
+
+import math
+
+from . import ntpublisher
+from .config import Config
+
+
+class RecursiveLeastSquares:
+    '''
+    Fits a single parameter theta in y = theta * x, one sample at a time.
+    Older samples are gradually forgotten, so the fit follows slow changes.
+    '''
+
+    def __init__(
+        self,
+        initial,
+        minSamples,
+        forgetting=0.999,
+        variance=1000.0
+    ):
+        self.theta = initial
+        self.minSamples = minSamples
+        self.forgetting = forgetting
+        self.variance = variance
+        self.residualVariance = 0.0
+        self.samples = 0
+
+
+    def update(self, x, y):
+        gain = self.variance * x / (self.forgetting + x * self.variance * x)
+
+        self.theta += gain * (y - self.theta * x)
+        self.variance = (self.variance - gain * x * self.variance)
+        self.variance /= self.forgetting
+
+        '''The spread of the samples around the new fit.'''
+        residual = y - self.theta * x
+        self.samples += 1
+        self.residualVariance += (
+            residual ** 2 - self.residualVariance
+        ) / min(self.samples, 100)
+
+
+    def getRelativeError(self):
+        '''The standard error of theta, as a fraction of theta.'''
+
+        if self.theta == 0:
+            return math.inf
+
+        spread = math.sqrt(self.variance * self.residualVariance)
+
+        return spread / abs(self.theta)
+
+
+class DriveCalibration:
+
+    '''Loops with smaller heading changes are too noisy to use.'''
+    minTurn = 0.5
+
+    '''An estimate is confident once its relative error is below this.'''
+    maxRelativeError = 0.01
+
+    '''Estimates closer than this fraction to the value in use are ignored.'''
+    minChange = 0.01
+
+    def __init__(self):
+        self.slipConfig = Config('DriveTrain/slip', 1.2)
+        self.diameterConfig = Config('DriveTrain/wheelDiameter')
+        self.ticksPerRotation = Config('DriveTrain/ticksPerRotation', 4096)
+        self.enabled = Config('DriveTrain/autoCalibrate', True)
+
+        self.slip = RecursiveLeastSquares(self.slipConfig.f or 1.0, 100)
+        self.diameter = RecursiveLeastSquares(
+            self.diameterConfig.f or 6.0,
+            3,
+            forgetting=1.0
+        )
+
+
+    def addTurn(self, encoderDegrees, gyroDegrees):
+        '''
+        Record one loop's rotation. Encoder degrees are measured using the
+        current slip factor, which is removed again here.
+        '''
+
+        if abs(gyroDegrees) < self.minTurn:
+            return
+
+        self.slip.update(gyroDegrees, encoderDegrees * self.slipConfig.f)
+
+
+    def addRun(self, ticks, inches):
+        '''Record a calibration run of known length, in encoder ticks.'''
+
+        rotations = abs(ticks) / self.ticksPerRotation.f
+        self.diameter.update(rotations * math.pi, abs(inches))
+
+
+    def publish(self):
+        '''Report the estimates, and apply them if they are confident.'''
+
+        self._publish('slip', self.slip, self.slipConfig)
+        self._publish('wheelDiameter', self.diameter, self.diameterConfig)
+
+
+    def _publish(self, name, estimate, config):
+        error = estimate.getRelativeError()
+
+        ntpublisher.put('Calibration', name, estimate.theta)
+        ntpublisher.put('Calibration', '%sError' % name, error)
+        ntpublisher.put('Calibration', '%sSamples' % name, estimate.samples)
+
+        if not self.enabled.b:
+            return
+
+        if estimate.samples < estimate.minSamples:
+            return
+
+        if error > self.maxRelativeError:
+            return
+
+        current = config.f
+        if current and abs(estimate.theta - current) < current * self.minChange:
+            return
+
+        ntpublisher.put('DriveTrain', name, round(estimate.theta, 4))
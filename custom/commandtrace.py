@@ -0,0 +1,257 @@
+'''
+Records what the command scheduler does, to find commands that are started and
+interrupted over and over. It is off by default. Set Robot/traceCommands to
+true in Config and restart the robot program to turn it on.
+
+Each event is stored in a ring buffer of the most recent events as a tuple of
+(time, event, command name, detail):
+    START: the command was initialized. Detail is a tuple of the time its
+           initialization took, in seconds, and the CAN frames it caused.
+    INTERRUPT: the command was cancelled because another one was scheduled.
+           Detail is a tuple of the subsystem they both require and the name
+           of the new command.
+    BLOCKED: a command could not start because the command using a subsystem
+           it requires cannot be interrupted. Detail is as for INTERRUPT, with
+           the name of the command that could not start.
+    END: the command was removed from the scheduler. Detail is True if it
+         was cancelled rather than finishing on its own.
+
+Totals for each command are kept separately, and once a second the commands
+that were started most are sent to the Commands/Trace table in NetworkTables.
+'''
+
+from collections import deque
+
+from wpilib import Timer
+from wpilib.command import Command, CommandGroup, PIDCommand, Scheduler
+
+from . import ntpublisher
+from .config import Config
+
+START = 'start'
+INTERRUPT = 'interrupt'
+BLOCKED = 'blocked'
+END = 'end'
+
+'''How many loops pass between summaries.'''
+publishInterval = 50
+
+'''How many commands are included in each summary.'''
+publishCount = 10
+
+enabled = False
+events = deque(maxlen=256)
+stats = {}
+outputs = None
+loopCount = 0
+
+
+class CommandStats:
+    '''Totals for every command with the same name.'''
+
+    def __init__(self):
+        self.starts = 0
+        self.interrupts = 0
+        self.initTime = 0.0
+        self.maxInitTime = 0.0
+        self.initFrames = 0
+
+
+    def getSummary(self):
+        '''
+        Returns the number of starts and interrupts, the average and longest
+        time taken to initialize in milliseconds and the average CAN frames it
+        caused.
+        '''
+
+        starts = max(self.starts, 1)
+        return [
+            self.starts,
+            self.interrupts,
+            self.initTime / starts * 1000,
+            self.maxInitTime * 1000,
+            self.initFrames / starts
+        ]
+
+
+def isEnabled():
+    return Config('Robot/traceCommands', False).b
+
+
+def enable(motorOutputs):
+    '''
+    Start tracing. This should be called from robotInit. CAN frames are
+    counted using the passed MotorOutputCache.
+    '''
+
+    global enabled, outputs
+
+    if enabled:
+        return
+
+    enabled = True
+    outputs = motorOutputs
+
+    scheduler = Scheduler.getInstance()
+    add = scheduler._add
+
+    def tracedAdd(command):
+        _checkRequirements(scheduler, command)
+        add(command)
+
+    scheduler._add = tracedAdd
+
+    '''
+    Command.run() calls _initialize() and initialize() the first time it runs,
+    followed by _execute() every time, so initialization is measured from
+    the first of those to the second. CommandGroup and PIDCommand replace
+    these methods rather than extending them, so they are traced as well.
+    '''
+    for commandClass in (Command, CommandGroup, PIDCommand):
+        _trace(commandClass)
+
+    removed = Command.removed
+
+    def tracedRemoved(self):
+        events.append(
+            (Timer.getFPGATimestamp(), END, self.getName(), self.isCanceled())
+        )
+        removed(self)
+
+    Command.removed = tracedRemoved
+
+
+def getStats(name):
+    '''Returns the CommandStats for the named command, creating it if needed.'''
+
+    try:
+        return stats[name]
+    except KeyError:
+        stats[name] = CommandStats()
+
+    return stats[name]
+
+
+def getEvents():
+    '''Returns the recorded events, oldest first.'''
+
+    return list(events)
+
+
+def endLoop():
+    '''This should be called at the end of every loop.'''
+
+    global loopCount
+
+    if not enabled:
+        return
+
+    loopCount += 1
+    if loopCount % publishInterval == 0:
+        publish()
+
+
+def publish():
+    '''Send totals for the most frequently started commands to the dashboard.'''
+
+    busiest = sorted(
+        stats.items(),
+        key=lambda item: item[1].starts,
+        reverse=True
+    )
+
+    for name, commandStats in busiest[:publishCount]:
+        ntpublisher.put(
+            'Commands/Trace',
+            name,
+            commandStats.getSummary(),
+            'putNumberArray'
+        )
+
+
+def _getFrames():
+    if outputs is None:
+        return 0
+
+    return outputs.getFrameCount()
+
+
+def _record(command, start):
+    '''Finish measuring a command's initialization.'''
+
+    startTime, startFrames = start
+    duration = Timer.getFPGATimestamp() - startTime
+    frames = _getFrames() - startFrames
+
+    name = command.getName()
+    commandStats = getStats(name)
+    commandStats.starts += 1
+    commandStats.initTime += duration
+    commandStats.maxInitTime = max(commandStats.maxInitTime, duration)
+    commandStats.initFrames += frames
+
+    events.append((startTime, START, name, (duration, frames)))
+
+
+def _trace(commandClass):
+    '''Wrap the shadow methods that the given class defines itself.'''
+
+    methods = vars(commandClass)
+
+    if '_initialize' in methods:
+        initialize = methods['_initialize']
+
+        def tracedInitialize(self):
+            self._traceStart = (Timer.getFPGATimestamp(), _getFrames())
+            initialize(self)
+
+        commandClass._initialize = tracedInitialize
+
+    if '_execute' in methods:
+        execute = methods['_execute']
+
+        def tracedExecute(self):
+            start = getattr(self, '_traceStart', None)
+            if start is not None:
+                self._traceStart = None
+                _record(self, start)
+
+            execute(self)
+
+        commandClass._execute = tracedExecute
+
+
+def _checkRequirements(scheduler, command):
+    '''
+    Record which running commands the scheduler is about to interrupt to
+    start the given command, or that will stop it from starting.
+    '''
+
+    if command is None or command in scheduler.commandTable:
+        return
+
+    '''Commands that hold several of the requirements are recorded once.'''
+    conflicts = []
+    seen = set()
+    for requirement in command.getRequirements():
+        current = requirement.getCurrentCommand()
+        if current is None or current is command or current in seen:
+            continue
+
+        seen.add(current)
+        conflicts.append((requirement, current))
+
+    now = Timer.getFPGATimestamp()
+    name = command.getName()
+    for requirement, current in conflicts:
+        if not current.isInterruptible():
+            events.append(
+                (now, BLOCKED, current.getName(), (requirement.getName(), name))
+            )
+            return
+
+    for requirement, current in conflicts:
+        getStats(current.getName()).interrupts += 1
+        events.append(
+            (now, INTERRUPT, current.getName(), (requirement.getName(), name))
+        )
@@ -1,12 +1,98 @@
-from networktables import NetworkTables, NetworkTable
+from networktables import NetworkTables
+from networktables.networktable import NetworkTable
+from array import array
+import marshal, os, threading, time
+
+from .logs import getStoragePath
 
 class MissingConfigError(KeyError):
     pass
 
 
-def configListener(table, key, entry, value, flags):
-    Config._values[key] = value.value()
-    Config._nt.setPersistent(key)
+'''
+Every Config value is also saved to a snapshot file, so values are available
+as soon as the robot program starts, even before NetworkTables has synced.
+Set snapshotPath to None to stop saving.
+'''
+snapshotPath = getStoragePath('config.snapshot')
+
+'''Seconds to wait after a change before saving, so bursts are saved once.'''
+saveDelay = 1.0
+
+
+def loadSnapshot():
+    '''Read the saved values, as a dict of key to value.'''
+
+    try:
+        with open(snapshotPath, 'rb') as f:
+            values = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return {}
+
+    if not isinstance(values, dict):
+        return {}
+
+    return values
+
+
+def saveSnapshot(values):
+    '''
+    Write the values to a temporary file and move it into place, so a reboot
+    during the save cannot leave a partial snapshot behind.
+    '''
+
+    path = snapshotPath
+    if path is None:
+        return
+
+    temporary = '%s.tmp' % path
+    try:
+        with open(temporary, 'wb') as f:
+            marshal.dump(values, f)
+
+        os.replace(temporary, path)
+    except (OSError, ValueError) as e:
+        print('Could not save config snapshot: %s' % e)
+
+
+def configListener(key, value, flags):
+    '''
+    Receives every change to a watched table. Keys that are neither in use nor
+    in the snapshot are ignored. Marking keys persistent is left to the saving
+    thread, so a burst of changes does not cost a call per change.
+    '''
+
+    key = key.lstrip(Config._sep)
+    slot = Config._slots.get(key)
+    if slot is not None:
+        Config._storeSlot(slot, value)
+    elif key not in Config._snapshot:
+        return
+
+    Config._snapshot[key] = value
+    if key not in Config._persisted:
+        Config._unpersisted.add(key)
+
+    Config._changed.set()
+
+
+def _saveChanges():
+    '''
+    Runs on a background thread, saving the snapshot and marking new keys
+    persistent after changes.
+    '''
+
+    while True:
+        Config._changed.wait()
+        time.sleep(saveDelay)
+        Config._changed.clear()
+
+        while Config._unpersisted:
+            key = Config._unpersisted.pop()
+            Config._nt.setPersistent(key)
+            Config._persisted.add(key)
+
+        saveSnapshot(dict(Config._snapshot))
 
 
 class Config:
@@ -14,11 +100,38 @@ class Config:
     Config values are stored on the roboRIO and updated using NetworkTables.
     By default the stored value is None, so make sure you set a value before
     running code that uses it.
+
+    Each key is assigned a slot in a set of flat arrays, so reading a value is
+    a single index operation. The f, i and b attributes return the value
+    already converted to a float, int or bool. Every change to a value bumps
+    Config.version and the slot's own version, so derived values can be cached
+    until one of their inputs changes.
+
+    Values start out as they were in the snapshot file. Each table that holds
+    a Config value has a listener that keeps the values in sync with
+    NetworkTables in the background and saves the snapshot when they change.
+    Other tables, such as those the robot publishes to every loop, are not
+    watched. Keys that are not in the snapshot are read from NetworkTables
+    when first used.
     '''
 
-    _values = {}
+    _slots = {}
+    _values = []
+    _floats = array('d')
+    _ints = array('q')
+    _bools = array('b')
+    _versions = array('L')
     _nt = None
-    _sep = NetworkTable.PATH_SEPARATOR_CHAR
+    _snapshot = loadSnapshot()
+    _changed = threading.Event()
+    _unpersisted = set()
+    _persisted = set()
+    _subscribers = {}
+    _tables = set()
+    _sep = NetworkTable.PATH_SEPARATOR
+
+    '''Incremented whenever any Config value changes.'''
+    version = 0
 
     def __init__(self, key, default=None):
         '''The key is the name that will be used in NetworkTables.'''
@@ -30,71 +143,182 @@ class Config:
             key = key[1:]
 
         self.key = key
-        if key in Config._values:
+        if key in Config._slots:
+            self.slot = Config._slots[key]
             return
 
         if Config._nt is None:
-            Config._nt = NetworkTables.getGlobalTable()
+            Config._start()
+
+        Config._watch(key.rpartition(self._sep)[0])
+
+        self.slot = len(Config._values)
+        Config._values.append(None)
+        Config._floats.append(0.0)
+        Config._ints.append(0)
+        Config._bools.append(False)
+        Config._versions.append(0)
+        Config._slots[key] = self.slot
+
+        if key in Config._snapshot:
+            Config._store(key, Config._snapshot[key])
+            return
+
+        value = Config._nt.getValue(key, None)
+        if value is None:
+            Config._store(key, default)
+            return
+
+        Config._store(key, value)
+        Config._snapshot[key] = value
+        Config._changed.set()
+
 
-        Config._values[key] = Config._nt.getValue(key, default)
-        Config._values[key] = Config._nt.getValue(key, default)
+    @classmethod
+    def _start(cls):
+        '''
+        Watch the tables of every key in the snapshot, so the snapshot stays
+        current, and start saving it.
+        '''
+
+        cls._nt = NetworkTables.getGlobalTable()
+
+        for key in list(cls._snapshot):
+            cls._watch(key.rpartition(cls._sep)[0])
+
+        threading.Thread(
+            target=_saveChanges,
+            name='Config snapshot',
+            daemon=True
+        ).start()
+
+
+    @classmethod
+    def _watch(cls, table):
+        '''
+        Listen for changes to the keys directly in the named table. Local
+        changes are included, because commands such as CalculateMaxSpeed
+        write Config values through NetworkTables.
+        '''
+
+        if table in cls._tables:
+            return
+
+        cls._tables.add(table)
+        prefix = table + cls._sep
+
+        def tableListener(source, key, value, flags):
+            configListener(prefix + key, value, flags)
 
         nf = NetworkTables.NotifyFlags
-        Config._nt.addEntryListener(
-            self.key,
-            configListener,
-            nf.LOCAL | nf.NEW | nf.UPDATE
+        NetworkTables.getTable(table).addEntryListenerEx(
+            tableListener,
+            nf.IMMEDIATE | nf.LOCAL | nf.NEW | nf.UPDATE,
+            paramIsNew=False
         )
 
 
-    def getValue(self):
-        val = Config._values.get(self.key)
-        if val is None:
-            raise MissingConfigError(f'{self.key} not set')
+    @classmethod
+    def _store(cls, key, value):
+        '''
+        Update a value in place. The typed copies are written before the
+        versions are bumped, so a reader that sees the new version also sees
+        the new value.
+        '''
 
-        return val
+        slot = cls._slots.get(key)
+        if slot is not None:
+            cls._storeSlot(slot, value)
 
 
-    def getValue(self):
-
-        return Config._values.get(self.key)
+    @classmethod
+    def _storeSlot(cls, slot, value):
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = 0.0
 
         try:
-            return Config._values[self.key]
-        except KeyError as e:
-            raise MissingConfigError from e
+            integer = int(value)
+        except (TypeError, ValueError, OverflowError):
+            integer = 0
+
+        if not -2**63 <= integer < 2**63:
+            integer = 0
 
-        val = Config._values.get(self.key)
-        if val is None:
-            raise MissingConfigError(f'{self.key} not set')
+        cls._values[slot] = value
+        cls._floats[slot] = number
+        cls._ints[slot] = integer
+        cls._bools[slot] = bool(value)
+        cls._versions[slot] += 1
+        cls.version += 1
 
-        return val
+        for callback in cls._subscribers.get(slot, ()):
+            try:
+                callback(value)
+            except Exception as e:
+                print('Config subscriber failed: %s' % e)
+
+
+    def getValue(self):
+        return Config._values[self.slot]
 
 
     def getKey(self):
         return self.key
 
 
+    def getVersion(self):
+        '''The number of times this value has changed.'''
+
+        return Config._versions[self.slot]
+
+
+    def subscribe(self, callback):
+        '''
+        Call the callback with the new value whenever this value changes. It
+        is usually called from the NetworkTables listener thread, so it should
+        only do something quick, such as marking a cached result as stale.
+        '''
+
+        Config._subscribers.setdefault(self.slot, []).append(callback)
+
+
+    @property
+    def f(self):
+        '''The value as a float, or 0.0 if it cannot be converted.'''
+
+        return Config._floats[self.slot]
+
+
+    @property
+    def i(self):
+        '''The value as an int, or 0 if it cannot be converted.'''
+
+        return Config._ints[self.slot]
+
+
+    @property
+    def b(self):
+        '''The value as a bool.'''
+
+        return bool(Config._bools[self.slot])
+
+
     '''
     We overload the "magic methods" for different primitive types that we would
     like to store in Config.
     '''
     def __bool__(self):
-        return bool(self.getValue())
+        return bool(Config._bools[self.slot])
 
 
     def __float__(self):
-        try:
-            return float(self.getValue())
-        except (TypeError, ValueError):
-            return 0.0
+        return Config._floats[self.slot]
 
 
     def __int__(self):
-        try:
-            return int(self.getValue())
-        except (TypeError, ValueError):
-            return 0
+        return Config._ints[self.slot]
 
 
     def __str__(self):
@@ -0,0 +1,54 @@
+from .config import Config
+
+
+class DerivedValue:
+    '''
+    A number calculated from one or more Config values. The result is cached
+    and only recalculated after one of the Config values it depends on
+    changes, so it is cheap enough to use every loop.
+    '''
+
+    def __init__(self, calculate, *dependencies):
+        '''
+        The calculate function will be passed the float value of each
+        dependency, in the order they are given here.
+        '''
+
+        self.calculate = calculate
+        self.dependencies = dependencies
+
+        self.stale = True
+        self.value = None
+
+        for config in dependencies:
+            config.subscribe(self.invalidate)
+
+
+    def invalidate(self, value=None):
+        '''Recalculate the value the next time it is requested.'''
+
+        self.stale = True
+
+
+    def get(self):
+        '''
+        Return the cached value, recalculating it first if any dependency has
+        changed. Changes to unrelated Config values cost nothing here.
+        '''
+
+        if self.stale:
+            '''
+            Cleared before reading, so a change made during the calculation
+            is picked up next time. If the calculation fails, for example
+            because a Config value is still missing, the value stays stale.
+            '''
+            self.stale = False
+            try:
+                self.value = self.calculate(
+                    *[config.f for config in self.dependencies]
+                )
+            except Exception:
+                self.stale = True
+                raise
+
+        return self.value
@@ -6,9 +6,11 @@ information from the dashboard and provide it to the program.
 from wpilib import SmartDashboard, DriverStation, SendableChooser
 from wpilib.command import Scheduler
 from wpilib import DriverStation
-from networktables import NetworkTables
+
+from . import alerts, ntpublisher
 
 autonChooser = None
+autonPrograms = {}
 
 from wpilib import RobotBase
 
@@ -26,27 +28,35 @@ def init():
     # Import here to avoid circular import
     from commands.autonomouscommandgroup import AutonomousCommandGroup
     from commands.drivetrain.resettiltcommand import ResetTiltCommand
-    from commands.tools.configurepidcommandgroup import ConfigurePIDCommandGroup
+    from commands.lazycommand import LazyCommand
 
 
     '''
     Add commands to the autonChooser to make them available for selection by the
     driver. It is best to choose a command that will not break anything if run
-    at the wrong time as the default command.
+    at the wrong time as the default command. Options are command classes or
+    other factories, so that only the program actually selected is built.
     '''
     autonChooser = SendableChooser()
-    autonChooser.setDefaultOption('Autonomous', AutonomousCommandGroup())
+    autonChooser.setDefaultOption('Autonomous', AutonomousCommandGroup)
 
     SmartDashboard.putData('Autonomous Program', autonChooser)
 
     showCommand(ResetTiltCommand())
-    showCommand(ConfigurePIDCommandGroup())
+    showCommand(LazyCommand('Configure PID', _buildConfigurePID))
+
+
+def _buildConfigurePID():
+    from commands.tools.configurepidcommandgroup import ConfigurePIDCommandGroup
+
+    return ConfigurePIDCommandGroup()
 
 
 def getAutonomousProgram():
     '''
     Return the autonomous program as selected on the dashboard. It is up to the
-    calling scope to start and cancel the command as needed.
+    calling scope to start and cancel the command as needed. Each program is
+    built the first time it is selected, and reused after that.
     '''
 
     global autonChooser
@@ -54,7 +64,11 @@ def getAutonomousProgram():
     if autonChooser is None:
         raise RuntimeError('Cannot select auton before HUD initializiation')
 
-    return autonChooser.getSelected()
+    factory = autonChooser.getSelected()
+    if factory not in autonPrograms:
+        autonPrograms[factory] = factory()
+
+    return autonPrograms[factory]
 
 
 def showCommand(cmd):
@@ -65,33 +79,29 @@ def showCommand(cmd):
     SmartDashboard.putData('Commands/%s' % name, cmd)
 
 
-def showAlert(msg, type='Alerts'):
-    '''Display a text notification on the dashboard.'''
+def showAlert(msg, type='Alerts', severity=alerts.WARNING):
+    '''
+    Display a text notification on the dashboard. It will be sent at the end of
+    the current loop.
+    '''
 
-    messages = SmartDashboard.getStringArray(type, [])
-    messages = [x for x in messages if x]
-    messages.append(msg)
-    SmartDashboard.putStringArray(
-        type,
-        messages
-    )
+    alerts.add(msg, type, severity)
 
 
 def showInfo(msg):
-    showAlert(msg, 'Info')
+    showAlert(msg, 'Info', alerts.INFO)
 
 
 def showField():
-    field = NetworkTables.getTable('Field');
     ds = DriverStation.getInstance()
 
     color = ds.getAlliance()
 
     if color == ds.Alliance.kRed:
-        field.putValue('color', 'red')
+        ntpublisher.put('Field', 'color', 'red')
     elif color == ds.Alliance.kBlue:
-        field.putValue('color', 'blue')
+        ntpublisher.put('Field', 'color', 'blue')
 
     layout = ds.getGameSpecificMessage()
     if layout:
-        field.putValue('layout', layout)
+        ntpublisher.put('Field', 'layout', layout)
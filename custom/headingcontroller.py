@@ -0,0 +1,107 @@
+'''
+Turns the robot to a heading by closing the loop on the navX every loop,
+rather than converting an angle to encoder ticks once and hoping the wheels do
+not slip.
+
+The heading follows a trapezoidal motion profile limited by
+DriveTrain/maxTurnRate (degrees per second) and DriveTrain/turnAcceleration
+(degrees per second squared). Each loop the commanded turn rate is the
+profile's rate as feedforward, plus DriveTrain/headingP times the error from
+the profile's heading, plus DriveTrain/headingD times the error from the
+profile's rate.
+
+The turn rate is converted to wheel speeds by BaseDrive.setChassisVelocity,
+using ticksPerDegree, which includes DriveTrain/slip. That is what the wheels
+need to turn the robot at the profile's rate, so a good slip value keeps the
+feedforward accurate. A wrong one only leaves an error for the gyro terms to
+correct, rather than a missed turn.
+
+A turn is finished once the profile is complete, the heading is within
+DriveTrain/headingTolerance degrees of the target and the robot is turning
+slower than DriveTrain/headingRateTolerance degrees per second.
+'''
+
+import math
+
+from .config import Config
+
+
+class HeadingController:
+
+    def __init__(self):
+        self.maxRate = Config('DriveTrain/maxTurnRate', 180)
+        self.maxAcceleration = Config('DriveTrain/turnAcceleration', 360)
+        self.headingP = Config('DriveTrain/headingP', 2)
+        self.headingD = Config('DriveTrain/headingD', 0)
+        self.tolerance = Config('DriveTrain/headingTolerance', 2)
+        self.rateTolerance = Config('DriveTrain/headingRateTolerance', 5)
+
+        self.target = None
+
+
+    def start(self, angle, target, rate=0.0):
+        '''
+        Begin a turn from the given gyro angle to the target, both in degrees
+        on the navX's continuous scale. The profile starts at the current turn
+        rate, so a turn can begin while the robot is still rotating.
+        '''
+
+        self.target = target
+        self.profileAngle = angle
+        self.profileRate = rate
+
+
+    def calculate(self, angle, rate, dt):
+        '''Returns the turn rate to command this loop, in degrees per second.'''
+
+        self._stepProfile(dt)
+
+        return (
+            self.profileRate
+            + self.headingP.f * (self.profileAngle - angle)
+            + self.headingD.f * (self.profileRate - rate)
+        )
+
+
+    def isFinished(self, angle, rate):
+        if self.profileAngle != self.target:
+            return False
+
+        return (
+            abs(self.target - angle) <= self.tolerance.f
+            and abs(rate) <= self.rateTolerance.f
+        )
+
+
+    def _stepProfile(self, dt):
+        '''Advance the profile toward the target by dt seconds.'''
+
+        maxRate = abs(self.maxRate.f) or math.inf
+        acceleration = abs(self.maxAcceleration.f) or math.inf
+
+        remaining = self.target - self.profileAngle
+        if remaining == 0:
+            self.profileRate = 0.0
+            return
+
+        '''Begin slowing down once the remaining turn is the stopping distance.'''
+        direction = math.copysign(1, remaining)
+        stopping = self.profileRate ** 2 / (2 * acceleration)
+        if abs(remaining) <= stopping and self.profileRate * direction > 0:
+            desired = 0.0
+        else:
+            desired = direction * maxRate
+
+        change = acceleration * dt
+        rate = self.profileRate
+        rate = max(rate - change, min(rate + change, desired))
+
+        step = rate * dt
+        if abs(step) >= abs(remaining) or (
+            rate * direction <= 0 and abs(remaining) < change * dt
+        ):
+            self.profileAngle = self.target
+            self.profileRate = 0.0
+        else:
+            self.profileAngle += step
+            self.profileRate = rate
@@ -0,0 +1,168 @@
+'''
+Converts between chassis motion and wheel speeds. Every drive type we use is
+linear, so each one can be described by a matrix with a row for each active
+wheel and a column for each of x (strafe), y (forward) and rotate. Multiplying
+a chassis command by that matrix gives wheel speeds, and multiplying wheel
+speeds by its pseudo-inverse gives the chassis motion that best explains them.
+
+Single commands are evaluated with plain Python, which is fastest for the small
+matrices involved. The batch methods evaluate many commands at once with NumPy,
+which must be installed to use them.
+'''
+
+import math
+
+
+class DriveKinematics:
+    '''The wheel mixing matrix for one type of drive base.'''
+
+    def __init__(self, matrix):
+        self.matrix = [tuple(row) for row in matrix]
+        self.inverse = _pseudoInverse(self.matrix)
+
+
+    def toWheelSpeeds(self, x, y, rotate, heading=None):
+        '''
+        Return a speed for each wheel. If a heading in degrees is passed, x and
+        y are treated as field oriented and rotated by it first.
+        '''
+
+        if heading is not None:
+            x, y = fieldOriented(x, y, heading)
+
+        return [a * x + b * y + c * rotate for a, b, c in self.matrix]
+
+
+    def toChassisSpeeds(self, wheelSpeeds):
+        '''Return the x, y and rotate that best explain the wheel speeds.'''
+
+        return [
+            sum(weight * speed for weight, speed in zip(row, wheelSpeeds))
+            for row in self.inverse
+        ]
+
+
+    def toWheelSpeedsBatch(self, x, y, rotate, heading=None):
+        '''
+        Like toWheelSpeeds, but each argument is a sequence of equal length.
+        Returns a NumPy array with one row per sample and one column per wheel.
+        '''
+
+        import numpy
+
+        x = numpy.asarray(x, dtype=float)
+        y = numpy.asarray(y, dtype=float)
+        rotate = numpy.asarray(rotate, dtype=float)
+
+        if heading is not None:
+            radians = numpy.radians(heading)
+            cosA = numpy.cos(radians)
+            sinA = numpy.sin(radians)
+            x, y = x * cosA - y * sinA, x * sinA + y * cosA
+
+        chassis = numpy.stack([x, y, rotate], axis=-1)
+
+        return chassis @ numpy.array(self.matrix).T
+
+
+    def toChassisSpeedsBatch(self, wheelSpeeds):
+        '''
+        Like toChassisSpeeds, but takes one row of wheel speeds per sample.
+        Returns a NumPy array with columns x, y and rotate.
+        '''
+
+        import numpy
+
+        wheelSpeeds = numpy.asarray(wheelSpeeds, dtype=float)
+
+        return wheelSpeeds @ numpy.array(self.inverse).T
+
+
+def fieldOriented(x, y, heading):
+    '''
+    Rotate joystick x and y by the robot's heading in degrees, so that the
+    robot moves in the direction the joystick is pushed regardless of which
+    way it is facing.
+    '''
+
+    radians = heading * math.pi / 180
+
+    cosA = math.cos(radians)
+    sinA = math.sin(radians)
+
+    return (x * cosA - y * sinA, x * sinA + y * cosA)
+
+
+def normalize(speeds):
+    '''Scale speeds down so that none is greater than 1, keeping their ratio.'''
+
+    maxSpeed = max(abs(speed) for speed in speeds)
+    if maxSpeed > 1:
+        return [speed / maxSpeed for speed in speeds]
+
+    return speeds
+
+
+def _pseudoInverse(matrix):
+    '''
+    Returns the least squares inverse of the matrix, inverse(A^T A) A^T, as a
+    list of rows. Columns that are all zero, such as x for a skid drive, are
+    left out of the solve and get all zero rows, since they can never be
+    observed.
+    '''
+
+    rows = len(matrix)
+    columns = [
+        c for c in range(len(matrix[0]))
+        if any(row[c] for row in matrix)
+    ]
+    size = len(columns)
+
+    '''Build A^T A next to an identity matrix and reduce it with Gauss-Jordan.'''
+    work = []
+    for i, ci in enumerate(columns):
+        product = [
+            sum(matrix[r][ci] * matrix[r][cj] for r in range(rows))
+            for cj in columns
+        ]
+        identity = [1.0 if i == j else 0.0 for j in range(size)]
+        work.append(product + identity)
+
+    for i in range(size):
+        pivot = max(range(i, size), key=lambda r: abs(work[r][i]))
+        work[i], work[pivot] = work[pivot], work[i]
+
+        scale = work[i][i]
+        work[i] = [value / scale for value in work[i]]
+
+        for r in range(size):
+            if r != i:
+                factor = work[r][i]
+                work[r] = [a - factor * b for a, b in zip(work[r], work[i])]
+
+    inverseProduct = [row[size:] for row in work]
+
+    inverse = [[0.0] * rows for c in range(len(matrix[0]))]
+    for i, ci in enumerate(columns):
+        for r in range(rows):
+            inverse[ci][r] = sum(
+                inverseProduct[i][j] * matrix[r][cj]
+                for j, cj in enumerate(columns)
+            )
+
+    return inverse
+
+
+'''Front left, front right, rear left, rear right.'''
+MECANUM = DriveKinematics([
+    (1, 1, 1),
+    (1, -1, 1),
+    (-1, 1, 1),
+    (-1, -1, 1),
+])
+
+'''Left, right.'''
+SKID = DriveKinematics([
+    (0, 1, 1),
+    (0, -1, 1),
+])
@@ -0,0 +1,35 @@
+'''
+Decides where files written by the robot program are stored. On the roboRIO
+they go in the home directory, since the program's own directory is replaced
+on every deploy. Anywhere else, such as in simulation, they go in the current
+directory, which is normally the repository.
+
+This module does not depend on wpilib, so offline tools can use it too.
+'''
+
+import os, time
+
+'''The robot program's home directory on the roboRIO.'''
+robotHome = '/home/lvuser'
+
+
+def getStoragePath(name):
+    '''Returns the path for a file or directory that should survive deploys.'''
+
+    if os.path.isdir(robotHome):
+        return os.path.join(robotHome, name)
+
+    return name
+
+
+def getLogPath(name, extension):
+    '''
+    Returns a unique path for a new log file, creating the log directory if
+    needed. The name describes what is being logged.
+    '''
+
+    directory = getStoragePath('logs')
+    os.makedirs(directory, exist_ok=True)
+
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directory, '%s-%s.%s' % (name, stamp, extension))
@@ -0,0 +1,129 @@
+'''
+Limits how quickly the drive train's inputs can change, so the motors are not
+asked for sudden steps in speed. Steps draw enough current to brown out the
+battery and break the wheels loose, which makes the robot slower, not faster.
+
+Each axis of move() (x, y and rotate) has its own acceleration limit, in full
+speed per second, and jerk limit, in full speed per second squared. Both are
+read from Config, and a limit of 0 turns it off:
+
+    DriveTrain/xAcceleration    DriveTrain/xJerk
+    DriveTrain/yAcceleration    DriveTrain/yJerk
+    DriveTrain/rotateAcceleration    DriveTrain/rotateJerk
+
+If DriveTrain/currentLimit is set, no axis may speed up while any drive motor
+draws more supply current than that many amps. Slowing down is always allowed.
+
+Only move() goes through the limiter. The drive's other outputs already shape
+their own motion, and limiting them again would only make them lag:
+
+    setPositions() uses Motion Magic, which ramps to the cruise velocity at
+    the acceleration the Talons are configured with.
+
+    setChassisVelocity() is used by TurnTo and FollowTrajectory, which follow
+    acceleration limited profiles and compare the robot against them in time.
+    MoveCommand also uses it to stop at once when an obstacle is too close.
+
+    setPercentOutput() is used by AutoTunePID, which needs a true step to
+    measure how the drive responds.
+'''
+
+import math
+
+from wpilib import Timer
+
+from .config import Config
+
+
+class MotionLimiter:
+    '''Tracks the limited value of each axis between loops.'''
+
+    axes = ('x', 'y', 'rotate')
+
+    '''Longer gaps than this between calls are treated as a single loop.'''
+    maxPeriod = 0.1
+
+    def __init__(self, sensors):
+        self.sensors = sensors
+
+        self.accelerations = [
+            Config('DriveTrain/%sAcceleration' % axis, 0) for axis in self.axes
+        ]
+        self.jerks = [
+            Config('DriveTrain/%sJerk' % axis, 0) for axis in self.axes
+        ]
+        self.currentLimit = Config('DriveTrain/currentLimit', 0)
+
+        self.reset()
+
+
+    def reset(self, values=(0.0, 0.0, 0.0)):
+        '''Forget the current motion, for example after the drive stops.'''
+
+        self.values = list(values)
+        self.rates = [0.0] * len(self.axes)
+        self.lastTime = None
+
+
+    def isSettled(self, targets):
+        '''Whether every axis has reached the given targets.'''
+
+        return self.values == list(targets)
+
+
+    def calculate(self, targets):
+        '''Returns the values to use this loop for the given target values.'''
+
+        now = Timer.getFPGATimestamp()
+        if self.lastTime is None:
+            dt = 0.02
+        else:
+            dt = min(max(now - self.lastTime, 0.0), self.maxPeriod)
+
+        self.lastTime = now
+        if dt == 0:
+            return list(self.values)
+
+        limit = self.currentLimit.f
+        overCurrent = limit > 0 and max(self.sensors.getCurrents()) > limit
+
+        for id, target in enumerate(targets):
+            self._step(id, target, dt, overCurrent)
+
+        return list(self.values)
+
+
+    def _step(self, id, target, dt, overCurrent):
+        value = self.values[id]
+        error = target - value
+        if error == 0:
+            self.rates[id] = 0.0
+            return
+
+        rate = error / dt
+
+        acceleration = self.accelerations[id].f
+        if acceleration > 0:
+            rate = max(-acceleration, min(acceleration, rate))
+
+        jerk = self.jerks[id].f
+        if jerk > 0:
+            '''Slow the change in time to arrive without overshooting.'''
+            arrival = math.sqrt(2 * jerk * abs(error))
+            rate = max(-arrival, min(arrival, rate))
+
+            change = jerk * dt
+            lastRate = self.rates[id]
+            rate = max(lastRate - change, min(lastRate + change, rate))
+
+        speedingUp = abs(value + rate * dt) > abs(value)
+        if overCurrent and speedingUp:
+            rate = 0.0
+
+        value += rate * dt
+        if (target - value) * error <= 0:
+            value = target
+            rate = 0.0
+
+        self.values[id] = value
+        self.rates[id] = rate
@@ -0,0 +1,133 @@
+'''
+Every call to a motor controller's set method becomes a CAN frame, even if the
+value being sent is identical to the last one. The MotorOutputCache remembers
+what each motor was last told to do, and only sends frames when something has
+actually changed.
+'''
+
+from ctre import ControlMode
+
+from . import ntpublisher
+
+
+class MotorOutputCache:
+    '''
+    Stages motor writes and sends them in one batch, normally once per robot
+    loop. Setpoints are quantized to the resolution the Talon actually uses, so
+    tiny floating point differences do not count as changes.
+    '''
+
+    '''The smallest meaningful change for each control mode.'''
+    resolution = {
+        ControlMode.PercentOutput: 1 / 1023,
+        ControlMode.Velocity: 1,
+        ControlMode.Position: 1,
+        ControlMode.MotionMagic: 1,
+    }
+
+    def __init__(self, motors):
+        self.motors = motors
+
+        self.sentFrames = 0
+        self.suppressedFrames = 0
+
+        '''Frames sent straight to the motors, such as configuration.'''
+        self.directFrames = 0
+
+        self.invalidate()
+
+
+    def set(self, id, mode, value):
+        '''
+        Stage a setpoint for the motor at the given index. Nothing is sent until
+        flush() is called. Staging twice in one loop keeps only the last value.
+        '''
+
+        steps = round(value / self.resolution.get(mode, 1))
+        self.pending[id] = (mode, steps)
+
+
+    def clearIntegral(self, id):
+        '''
+        Stage a reset of the motor's I accumulator. If it has already been
+        cleared and the motor has not been driven since, nothing will be sent.
+        '''
+
+        self.pendingClears[id] = True
+
+
+    def flush(self):
+        '''Send all staged writes that differ from what the motors already have.'''
+
+        for id, motor in enumerate(self.motors):
+            if self.pendingClears[id]:
+                self.pendingClears[id] = False
+                if self.accumulatorCleared[id]:
+                    self.suppressedFrames += 1
+                else:
+                    motor.setIntegralAccumulator(0, 0, 0)
+                    self.accumulatorCleared[id] = True
+                    self.sentFrames += 1
+
+            staged = self.pending[id]
+            if staged is None:
+                continue
+
+            self.pending[id] = None
+            mode, steps = staged
+            if mode == self.modes[id] and steps == self.setpoints[id]:
+                self.suppressedFrames += 1
+                continue
+
+            motor.set(mode, steps * self.resolution.get(mode, 1))
+            self.modes[id] = mode
+            self.setpoints[id] = steps
+            self.sentFrames += 1
+
+            if steps != 0:
+                self.accumulatorCleared[id] = False
+
+
+    def countDirect(self, frames):
+        '''Record frames that were sent to the motors without this cache.'''
+
+        self.directFrames += frames
+
+
+    def getFrameCount(self):
+        '''
+        How many frames have been sent or staged so far. The difference
+        between two calls is the CAN traffic caused by the code in between.
+        '''
+
+        staged = sum(1 for entry in self.pending if entry is not None)
+
+        return self.sentFrames + self.directFrames + staged
+
+
+    def invalidate(self):
+        '''
+        Forget everything we know about the motors' state, and discard any
+        staged writes. Call this whenever the motors are changed by something
+        other than this cache, such as stopMotor().
+        '''
+
+        count = len(self.motors)
+        self.modes = [None] * count
+        self.setpoints = [None] * count
+        self.accumulatorCleared = [False] * count
+        self.pending = [None] * count
+        self.pendingClears = [False] * count
+
+
+    def publish(self, table):
+        '''Queue frame counts for the named NetworkTable.'''
+
+        ntpublisher.put(table, 'sentFrames', self.sentFrames, 'putNumber')
+        ntpublisher.put(
+            table,
+            'suppressedFrames',
+            self.suppressedFrames,
+            'putNumber'
+        )
+        ntpublisher.put(table, 'directFrames', self.directFrames, 'putNumber')
@@ -0,0 +1,120 @@
+'''
+Sends dashboard data to NetworkTables from a background thread, so the robot
+loop never waits on NetworkTables. Updates are appended to a queue, which is
+safe to do from any thread without a lock, and the background thread drains it
+at Robot/publishRate times a second.
+
+Only the last value written to each key since the previous flush is sent, so a
+value that is updated every loop costs one NetworkTables write per flush rather
+than one per loop. This holds even if the writes used different methods.
+
+Values that something else reads back through NetworkTables, such as Config
+values, only change once the next flush has run.
+'''
+
+from collections import deque, OrderedDict
+import threading, time
+
+from networktables import NetworkTables
+
+from .config import Config
+
+queue = deque()
+tables = {}
+
+'''Held while flushing, so a direct flush() does not race the thread.'''
+flushLock = threading.Lock()
+
+thread = None
+running = False
+
+
+def put(table, key, value, method='putValue'):
+    '''
+    Queue a value to be written to the named table. The method is the name of
+    the NetworkTable method used to write it, such as putNumberArray.
+    '''
+
+    queue.append((table, key, method, value))
+
+
+def setPersistent(table, key):
+    '''Queue marking a key as persistent, so it is saved on the roboRIO.'''
+
+    queue.append((table, key, 'setPersistent', None))
+
+
+def flush():
+    '''
+    Write everything queued so far. This is normally called by the background
+    thread, and directly when the thread may not get another chance to run.
+    '''
+
+    with flushLock:
+        updates = OrderedDict()
+        persistent = set()
+        try:
+            while True:
+                table, key, method, value = queue.popleft()
+                if method == 'setPersistent':
+                    persistent.add((table, key))
+                else:
+                    updates[(table, key)] = (method, value)
+        except IndexError:
+            pass
+
+        '''Keys are marked persistent after they have been written.'''
+        for table, key in persistent:
+            updates.setdefault((table, key), ('setPersistent', None))
+
+        for (name, key), (method, value) in updates.items():
+            try:
+                table = tables[name]
+            except KeyError:
+                table = tables[name] = NetworkTables.getTable(name)
+
+            try:
+                if method != 'setPersistent':
+                    getattr(table, method)(key, value)
+
+                if (name, key) in persistent:
+                    table.setPersistent(key)
+            except (TypeError, ValueError) as e:
+                print('Could not publish %s/%s: %s' % (name, key, e))
+
+
+def start():
+    '''Start the background thread. Calling this more than once is harmless.'''
+
+    global thread, running
+
+    if running:
+        return
+
+    '''Config values must be created on the main thread.'''
+    rate = Config('Robot/publishRate', 10)
+
+    running = True
+    thread = threading.Thread(
+        target=_run,
+        args=(rate,),
+        name='NetworkTables publisher',
+        daemon=True
+    )
+    thread.start()
+
+
+def stop():
+    '''Stop the background thread after its current flush.'''
+
+    global running
+
+    running = False
+    if thread is not None:
+        thread.join()
+
+
+def _run(rate):
+    while running:
+        flush()
+        time.sleep(1 / max(rate.f, 1))
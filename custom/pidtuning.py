@@ -0,0 +1,378 @@
+'''
+Calculates Talon SRX PID gains from a measured step response of the drive.
+The response is fitted with a first order plus dead time model, and gains for
+both Talon profiles are derived from it with the SIMC tuning rules:
+
+    Profile 0 (Speed) is a velocity loop around the motor itself.
+    Profile 1 (Position) is the Motion Magic position loop, which sees the
+    motor as an integrator with a lag.
+
+All gains are in Talon native units: an output of 1023 is full power, errors
+are measured in encoder ticks (or ticks per 100 ms), and the loops run every
+millisecond.
+
+This module does not depend on wpilib. Step responses saved by
+AutoTunePIDCommand can be refined on a laptop with a parallel grid search:
+
+    python3 -m custom.pidtuning [--robot HOST] logs/step-20190301-134500.json
+
+The refined gains for both profiles are saved next to the first step response,
+in a file ending in -gains.json. With --robot, they are also written to the
+DriveTrain/Speed and DriveTrain/Position tables on the robot at HOST, where
+the drive train picks them up just as it does after AutoTunePIDCommand.
+'''
+
+from concurrent.futures import ProcessPoolExecutor
+import itertools, json, math, os, sys, time
+
+'''The Talon closed loop period, in seconds.'''
+talonPeriod = 0.001
+
+
+class FirstOrderModel:
+    '''
+    A first order plus dead time model. Gain is the steady state velocity in
+    ticks per 100 ms for each unit of percent output.
+    '''
+
+    def __init__(self, gain, timeConstant, deadTime):
+        self.gain = gain
+        self.timeConstant = max(timeConstant, talonPeriod)
+        self.deadTime = max(deadTime, 0.0)
+
+
+    def __repr__(self):
+        return 'FirstOrderModel(gain=%f, timeConstant=%f, deadTime=%f)' % (
+            self.gain,
+            self.timeConstant,
+            self.deadTime
+        )
+
+
+def fitFirstOrder(times, velocities, output):
+    '''
+    Fit a model to a step response using the two point method. The times are
+    in seconds since the step of the given percent output was applied.
+    '''
+
+    count = len(velocities)
+    if count < 10:
+        raise ValueError('Step response is too short to fit')
+
+    '''Average the last fifth of the response to find the steady state.'''
+    tail = velocities[-max(count // 5, 1):]
+    final = sum(tail) / len(tail)
+    if final == 0:
+        raise ValueError('The drive did not move during the step')
+
+    def crossing(fraction):
+        threshold = final * fraction
+        for i in range(1, count):
+            if abs(velocities[i]) >= abs(threshold):
+                before = velocities[i - 1]
+                span = velocities[i] - before
+                part = (threshold - before) / span if span else 0
+                return times[i - 1] + (times[i] - times[i - 1]) * part
+
+        return times[-1]
+
+    t28 = crossing(0.283)
+    t63 = crossing(0.632)
+    timeConstant = 1.5 * (t63 - t28)
+
+    return FirstOrderModel(final / output, timeConstant, t63 - timeConstant)
+
+
+def calculateGains(model, tightness=1.0):
+    '''
+    Returns a dict of gains for each profile, such as gains['Speed']['P'].
+    Tightness scales the desired closed loop time constant relative to the
+    dead time; smaller values are more aggressive.
+    '''
+
+    gain = abs(model.gain)
+    tau = model.timeConstant
+    theta = model.deadTime
+    closedLoop = max(tightness * theta, 4 * talonPeriod)
+
+    '''Process gain per native output unit.'''
+    velocityGain = gain / 1023
+    F = 1023 / gain
+
+    '''SIMC PI for a first order process, with feed forward doing most work.'''
+    speedP = tau / (velocityGain * (closedLoop + theta))
+    speedTi = min(tau, 4 * (closedLoop + theta))
+
+    '''
+    The position loop sees an integrator with a lag. Velocity is per 100 ms,
+    so position changes ten times faster per second.
+    '''
+    positionGain = velocityGain * 10
+    positionP = 1 / (positionGain * (closedLoop + theta))
+    positionTi = 4 * (closedLoop + theta)
+
+    '''
+    The derivative rule from the Motion Magic walkthrough. The SIMC value is
+    far too large for the Talon's 1 ms derivative.
+    '''
+    positionD = positionP * 10
+
+    return {
+        'Speed': {
+            'F': F,
+            'P': speedP,
+            'I': speedP * talonPeriod / speedTi,
+            'D': 0.0,
+            'IZone': gain * 0.1,
+        },
+        'Position': {
+            'F': F,
+            'P': positionP,
+            'I': positionP * talonPeriod / positionTi,
+            'D': positionD,
+            'IZone': gain * 10 * (closedLoop + theta),
+        },
+    }
+
+
+def simulateVelocityLoop(model, gains, setpoint, duration=1.5):
+    '''
+    Simulate the Talon velocity loop against the model and return the
+    integral of time weighted absolute error (ITAE), plus a penalty for
+    overshoot. Lower is better.
+    '''
+
+    steps = int(duration / talonPeriod)
+    delay = [0.0] * max(int(model.deadTime / talonPeriod), 1)
+    velocity = 0.0
+    integral = 0.0
+    lastError = setpoint
+    cost = 0.0
+    peak = 0.0
+
+    for step in range(steps):
+        error = setpoint - velocity
+        if not gains['IZone'] or abs(error) < gains['IZone']:
+            integral += error
+        else:
+            integral = 0
+
+        output = (
+            gains['F'] * setpoint
+            + gains['P'] * error
+            + gains['I'] * integral
+            + gains['D'] * (error - lastError)
+        )
+        lastError = error
+        output = max(-1023, min(1023, output)) / 1023
+
+        delay.append(output)
+        applied = delay.pop(0)
+
+        target = applied * model.gain
+        velocity += (target - velocity) * talonPeriod / model.timeConstant
+
+        cost += step * talonPeriod * abs(error) * talonPeriod
+        peak = max(peak, velocity)
+
+    overshoot = max(peak - setpoint, 0)
+
+    return cost + overshoot * duration
+
+
+def simulatePositionLoop(model, gains, distance, duration=2.0):
+    '''
+    Simulate a Motion Magic move of the given distance in ticks against the
+    model, and return the integral of time weighted absolute error from the
+    profile, plus a penalty for overshooting the end. Lower is better. The
+    profile cruises at half the drive's top speed and reaches it in 0.25 s.
+    '''
+
+    steps = int(duration / talonPeriod)
+    delay = [0.0] * max(int(model.deadTime / talonPeriod), 1)
+    cruise = abs(model.gain) / 2
+    acceleration = cruise / 0.25
+    profilePosition = 0.0
+    profileVelocity = 0.0
+    position = 0.0
+    velocity = 0.0
+    integral = 0.0
+    lastError = 0.0
+    cost = 0.0
+    peak = 0.0
+
+    for step in range(steps):
+        '''Velocities are per 100 ms, so positions change ten times faster.'''
+        stopping = profileVelocity ** 2 / (2 * acceleration) * 10
+        if distance - profilePosition <= stopping:
+            profileVelocity = max(
+                profileVelocity - acceleration * talonPeriod,
+                0.0
+            )
+        else:
+            profileVelocity = min(
+                profileVelocity + acceleration * talonPeriod,
+                cruise
+            )
+
+        profilePosition = min(
+            profilePosition + profileVelocity * 10 * talonPeriod,
+            distance
+        )
+
+        error = profilePosition - position
+        if not gains['IZone'] or abs(error) < gains['IZone']:
+            integral += error
+        else:
+            integral = 0
+
+        output = (
+            gains['F'] * profileVelocity
+            + gains['P'] * error
+            + gains['I'] * integral
+            + gains['D'] * (error - lastError)
+        )
+        lastError = error
+        output = max(-1023, min(1023, output)) / 1023
+
+        delay.append(output)
+        applied = delay.pop(0)
+
+        target = applied * model.gain
+        velocity += (target - velocity) * talonPeriod / model.timeConstant
+        position += velocity * 10 * talonPeriod
+
+        cost += step * talonPeriod * abs(error) * talonPeriod
+        peak = max(peak, position)
+
+    overshoot = max(peak - distance, 0)
+
+    return cost + overshoot * duration
+
+
+def _evaluate(job):
+    models, profile, gains, setpoints = job
+
+    simulate = simulateVelocityLoop
+    if profile == 'Position':
+        simulate = simulatePositionLoop
+
+    return sum(
+        simulate(model, gains, setpoint)
+        for model in models
+        for setpoint in setpoints
+    )
+
+
+def searchGains(
+    models,
+    profile='Speed',
+    scales=(0.25, 0.5, 1, 2, 4),
+    processes=None
+):
+    '''
+    Grid search around the SIMC gains for the given profile, scoring each
+    candidate against every model. Speed gains are tried at several
+    setpoints, and Position gains on moves of several lengths. P is scaled
+    along with I for Speed, and with D for Position. Returns the best gains
+    found.
+    '''
+
+    base = calculateGains(models[0])[profile]
+    topSpeed = abs(models[0].gain)
+    if profile == 'Position':
+        '''Moves of about one and three seconds at full speed.'''
+        setpoints = [topSpeed * 10 * seconds for seconds in (1, 3)]
+        second = 'D'
+    else:
+        setpoints = [topSpeed * fraction for fraction in (0.3, 0.7)]
+        second = 'I'
+
+    candidates = []
+    for pScale, otherScale in itertools.product(scales, repeat=2):
+        gains = dict(base)
+        gains['P'] *= pScale
+        gains[second] *= otherScale
+        candidates.append(gains)
+
+    with ProcessPoolExecutor(processes) as pool:
+        costs = list(pool.map(
+            _evaluate,
+            [(models, profile, gains, setpoints) for gains in candidates]
+        ))
+
+    return candidates[costs.index(min(costs))]
+
+
+def sendGains(host, gains, timeout=5):
+    '''
+    Write gains, as returned by calculateGains, to the DriveTrain tables on
+    the robot at the given host. Returns whether the robot was reached.
+    '''
+
+    from networktables import NetworkTables
+
+    NetworkTables.initialize(server=host)
+    deadline = time.monotonic() + timeout
+    while not NetworkTables.isConnected():
+        if time.monotonic() > deadline:
+            NetworkTables.shutdown()
+            return False
+
+        time.sleep(0.1)
+
+    for profile, values in gains.items():
+        table = NetworkTables.getTable('DriveTrain/%s' % profile)
+        for key, value in values.items():
+            table.putNumber(key, value)
+
+    NetworkTables.flush()
+
+    '''Give the values time to reach the robot before disconnecting.'''
+    time.sleep(0.5)
+    NetworkTables.shutdown()
+
+    return True
+
+
+def loadStepResponse(path):
+    '''Read a step response saved by AutoTunePIDCommand.'''
+
+    with open(path) as f:
+        data = json.load(f)
+
+    return fitFirstOrder(data['times'], data['velocities'], data['output'])
+
+
+if __name__ == '__main__':
+    paths = sys.argv[1:]
+    host = None
+    if paths[:1] == ['--robot'] and len(paths) > 1:
+        host = paths[1]
+        paths = paths[2:]
+
+    if not paths:
+        print(__doc__.strip())
+        sys.exit(2)
+
+    models = [loadStepResponse(path) for path in paths]
+    for model in models:
+        print(model)
+
+    gains = {}
+    for profile in ('Speed', 'Position'):
+        gains[profile] = searchGains(models, profile)
+        print('%s gains: %s' % (profile, gains[profile]))
+
+    output = '%s-gains.json' % os.path.splitext(paths[0])[0]
+    with open(output, 'w') as f:
+        json.dump(gains, f, indent=4, sort_keys=True)
+
+    print('Saved gains to %s' % output)
+
+    if host is not None:
+        if sendGains(host, gains):
+            print('Sent gains to %s' % host)
+        else:
+            print('Could not connect to %s' % host)
+            sys.exit(1)
@@ -0,0 +1,347 @@
+'''
+The profiler measures how long each part of the robot loop takes. It is off by
+default. Set Robot/profile to true in Config and restart the robot program to
+turn it on.
+
+When enabled, every command that is scheduled has its initialize, execute,
+isFinished, end and interrupted methods timed, as does the periodic method of
+each subsystem. When interrupted calls end, the time is only counted for
+interrupted. Once a second a summary is sent to the Profiler table in
+NetworkTables, and every sample is appended to a binary log file.
+
+Samples are packed into preallocated buffers, so profiling does not allocate
+memory in the robot loop. Full buffers are handed to a background thread that
+writes them to disk and returns them for reuse. The file is closed when the
+robot program exits.
+
+The log file starts with MAGIC. It is followed by records, each beginning with
+a one byte type:
+    N: a name was assigned an id. Followed by the id and name length as
+       unsigned shorts, then the UTF-8 name.
+    S: a sample. Followed by the name id as an unsigned short and the duration
+       in seconds as a float.
+    L: a loop ended. Followed by the time as a double and the loop duration
+       in seconds as a float.
+'''
+
+from array import array
+from collections import deque
+import atexit, struct, threading, time
+
+from wpilib.command import Scheduler
+
+from . import ntpublisher
+from .config import Config
+from .logs import getLogPath
+
+MAGIC = b'PYBOTPRF1'
+
+nameRecord = struct.Struct('<cHH')
+sampleRecord = struct.Struct('<cHf')
+loopRecord = struct.Struct('<cdf')
+
+'''The robot loop is expected to run every 20 ms.'''
+loopPeriod = 0.02
+
+'''How many loops pass between summaries.'''
+publishInterval = 50
+
+'''Size in bytes of each buffer. One holds several seconds of samples.'''
+bufferSize = 1 << 16
+
+enabled = False
+timings = {}
+loops = None
+overruns = 0
+loopCount = 0
+logFile = None
+
+'''The buffer being filled, and how many bytes of it are used.'''
+buffer = bytearray(bufferSize)
+used = 0
+
+'''Buffers waiting to be written, with their length, and empty buffers.'''
+writeQueue = deque()
+freeBuffers = deque()
+
+writer = None
+writeReady = threading.Event()
+running = False
+
+
+class Timings:
+    '''A rolling window of durations measured for one piece of code.'''
+
+    size = 256
+
+    def __init__(self, name, id):
+        self.name = name
+        self.id = id
+        self.samples = array('d', [0.0] * self.size)
+        self.count = 0
+        self.max = 0.0
+
+
+    def add(self, duration):
+        self.samples[self.count % self.size] = duration
+        self.count += 1
+        if duration > self.max:
+            self.max = duration
+
+        offset = _reserve(sampleRecord.size)
+        sampleRecord.pack_into(buffer, offset, b'S', self.id, duration)
+
+
+    def getSummary(self):
+        '''Returns the median, 99th percentile and maximum, in milliseconds.'''
+
+        count = min(self.count, self.size)
+        if count == 0:
+            return [0.0, 0.0, 0.0]
+
+        recent = sorted(self.samples[:count])
+        return [
+            recent[count // 2] * 1000,
+            recent[min(int(count * 0.99), count - 1)] * 1000,
+            self.max * 1000
+        ]
+
+
+def isEnabled():
+    return Config('Robot/profile', False).b
+
+
+def enable(subsystems):
+    '''
+    Start profiling. This should be called from robotInit, after the passed
+    subsystems have been created.
+    '''
+
+    global enabled, loops, logFile, writer, running
+
+    if enabled:
+        return
+
+    enabled = True
+    loops = getTimings('loop')
+    logFile = open(getLogPath('profile', 'bin'), 'wb')
+    logFile.write(MAGIC)
+
+    running = True
+    writer = threading.Thread(
+        target=_writeLoop,
+        name='Profiler writer',
+        daemon=True
+    )
+    writer.start()
+    atexit.register(close)
+
+    for subsystem in subsystems:
+        subsystem.periodic = _timed(
+            subsystem.periodic,
+            getTimings('%s.periodic' % subsystem.getName())
+        )
+
+    '''Commands are instrumented as they are scheduled.'''
+    scheduler = Scheduler.getInstance()
+    add = scheduler._add
+
+    def instrumentedAdd(command):
+        instrument(command)
+        add(command)
+
+    scheduler._add = instrumentedAdd
+
+
+def getTimings(name):
+    '''Returns the Timings for the given name, creating them if needed.'''
+
+    try:
+        return timings[name]
+    except KeyError:
+        pass
+
+    id = len(timings)
+    timings[name] = Timings(name, id)
+
+    encoded = name.encode('utf-8')
+    offset = _reserve(nameRecord.size + len(encoded))
+    nameRecord.pack_into(buffer, offset, b'N', id, len(encoded))
+    offset += nameRecord.size
+    buffer[offset:offset + len(encoded)] = encoded
+
+    return timings[name]
+
+
+def instrument(command):
+    '''Time each of the given command's methods, and those of its children.'''
+
+    if command is None or getattr(command, '_profiled', False):
+        return
+
+    command._profiled = True
+    name = command.getName()
+    end = command.end
+    for method in ['initialize', 'execute', 'isFinished', 'end', 'interrupted']:
+        setattr(
+            command,
+            method,
+            _timed(
+                getattr(command, method),
+                getTimings('%s.%s' % (name, method))
+            )
+        )
+
+    '''
+    Command.interrupted() calls end() by default, and so do many commands that
+    override it. That time is already counted for interrupted, so end() is
+    only timed when it is called on its own.
+    '''
+    timedEnd = command.end
+    timedInterrupted = command.interrupted
+
+    def interrupted():
+        command.end = end
+        try:
+            return timedInterrupted()
+        finally:
+            command.end = timedEnd
+
+    command.interrupted = interrupted
+
+    '''Command groups run their children without the scheduler.'''
+    for entry in getattr(command, 'commands', []):
+        instrument(entry.command)
+
+
+def endLoop(duration):
+    '''
+    Record how long the whole loop took. This should be called at the end of
+    every loop. It occasionally publishes a summary and writes the log.
+    '''
+
+    global overruns, loopCount
+
+    if not enabled:
+        return
+
+    loops.add(duration)
+    offset = _reserve(loopRecord.size)
+    loopRecord.pack_into(buffer, offset, b'L', time.time(), duration)
+    if duration > loopPeriod:
+        overruns += 1
+
+    loopCount += 1
+    if loopCount % publishInterval == 0:
+        publish()
+
+
+def publish():
+    '''Send a summary to the dashboard and queue buffered samples for disk.'''
+
+    for name, timing in timings.items():
+        ntpublisher.put(
+            'Profiler',
+            name,
+            timing.getSummary(),
+            'putNumberArray'
+        )
+
+    ntpublisher.put('Profiler', 'overruns', overruns, 'putNumber')
+
+    _handOff()
+
+
+def close():
+    '''
+    Write everything recorded so far and close the log. This is called
+    automatically when the robot program exits.
+    '''
+
+    global running
+
+    if logFile is None or logFile.closed:
+        return
+
+    _handOff()
+    running = False
+    writeReady.set()
+    if writer is not None:
+        writer.join()
+
+    logFile.close()
+
+
+def _reserve(size):
+    '''
+    Returns the offset at which size bytes can be packed into the current
+    buffer. If there is not enough room, the buffer is handed to the writer
+    first. A new buffer is only allocated if the writer has fallen behind.
+    '''
+
+    global used
+
+    if used + size > len(buffer):
+        _handOff()
+
+    offset = used
+    used += size
+
+    return offset
+
+
+def _handOff():
+    '''Queue the current buffer for writing and start filling an empty one.'''
+
+    global buffer, used
+
+    if used == 0:
+        return
+
+    writeQueue.append((buffer, used))
+    writeReady.set()
+
+    try:
+        buffer = freeBuffers.popleft()
+    except IndexError:
+        buffer = bytearray(bufferSize)
+
+    used = 0
+
+
+def _writeLoop():
+    '''Runs on the background thread, writing queued buffers to disk.'''
+
+    while True:
+        writeReady.wait()
+        writeReady.clear()
+
+        wrote = False
+        try:
+            while True:
+                full, length = writeQueue.popleft()
+                logFile.write(memoryview(full)[:length])
+                freeBuffers.append(full)
+                wrote = True
+        except IndexError:
+            pass
+
+        if wrote:
+            logFile.flush()
+
+        '''Buffers are queued before running is cleared, so none are lost.'''
+        if not running and not writeQueue:
+            return
+
+
+def _timed(func, timing):
+    '''Wrap a function so that each call is added to the given Timings.'''
+
+    def timed(*args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            timing.add(time.perf_counter() - start)
+
+    return timed
@@ -0,0 +1,158 @@
+'''
+Reading a sensor value from a Talon or the navX crosses into the vendor
+libraries every time. When several commands ask for the same values in one
+loop, those reads are wasted. A SensorSnapshot reads each value at most once
+per loop and answers every later request from memory.
+'''
+
+from array import array
+
+
+class SensorSnapshot:
+    '''
+    Holds one reading of each drive train sensor. A value is read the first
+    time it is requested after invalidate() has been called, which should
+    happen once at the start of every robot loop. Values that nothing asks for,
+    such as the supply current when there is no current limit, are not read.
+    '''
+
+    '''Layout of the per-motor section of the values array.'''
+    POSITION = 0
+    VELOCITY = 1
+    TARGET = 2
+    OUTPUT = 3
+    CURRENT = 4
+    motorFields = 5
+
+    '''Layout of the gyro section, which follows the motor section.'''
+    ANGLE = 0
+    PITCH = 1
+    ACCELERATION = 2
+    RATE = 3
+    gyroFields = 4
+
+    '''How each field is read, in the same order as the layouts above.'''
+    motorReaders = (
+        lambda motor: motor.getSelectedSensorPosition(0),
+        lambda motor: motor.getSelectedSensorVelocity(0),
+        lambda motor: motor.getClosedLoopTarget(0),
+        lambda motor: motor.getMotorOutputPercent(),
+        lambda motor: motor.getSupplyCurrent(),
+    )
+    gyroReaders = (
+        lambda navX: navX.getAngle(),
+        lambda navX: navX.getPitch(),
+        lambda navX: navX.getWorldLinearAccelY(),
+        lambda navX: navX.getRate(),
+    )
+
+    def __init__(self, motors, navX):
+        self.motors = motors
+        self.navX = navX
+
+        self.gyroOffset = len(motors) * self.motorFields
+        self.values = array('d', [0.0] * (self.gyroOffset + self.gyroFields))
+
+        '''
+        Readings are fresh when they were taken in the current loop. Counting
+        loops means invalidate() does not have to clear every field.
+        '''
+        self.loop = 0
+        self.motorLoops = [-1] * self.motorFields
+        self.gyroLoops = [-1] * self.gyroFields
+        self.connectedLoop = -1
+        self.connected = False
+
+
+    def invalidate(self):
+        '''Throw away the current readings. The next requests will refresh.'''
+
+        self.loop += 1
+
+
+    def readMotors(self, field):
+        '''Make sure the given field is fresh for every motor.'''
+
+        if self.motorLoops[field] == self.loop:
+            return
+
+        read = self.motorReaders[field]
+        values = self.values
+        offset = field
+        for motor in self.motors:
+            values[offset] = read(motor)
+            offset += self.motorFields
+
+        self.motorLoops[field] = self.loop
+
+
+    def readGyro(self, field):
+        '''Make sure the given navX field is fresh.'''
+
+        if self.gyroLoops[field] == self.loop:
+            return
+
+        self.values[self.gyroOffset + field] = self.gyroReaders[field](self.navX)
+        self.gyroLoops[field] = self.loop
+
+
+    def getMotorValues(self, field):
+        '''Returns the given field for each motor, in motor order.'''
+
+        self.readMotors(field)
+
+        return list(self.values[field:self.gyroOffset:self.motorFields])
+
+
+    def getGyroValue(self, field):
+        '''Returns a single navX reading.'''
+
+        self.readGyro(field)
+
+        return self.values[self.gyroOffset + field]
+
+
+    def getPositions(self):
+        return self.getMotorValues(self.POSITION)
+
+
+    def getSpeeds(self):
+        return self.getMotorValues(self.VELOCITY)
+
+
+    def getTargets(self):
+        return self.getMotorValues(self.TARGET)
+
+
+    def getOutputs(self):
+        return self.getMotorValues(self.OUTPUT)
+
+
+    def getCurrents(self):
+        return self.getMotorValues(self.CURRENT)
+
+
+    def getAngle(self):
+        return self.getGyroValue(self.ANGLE)
+
+
+    def getPitch(self):
+        return self.getGyroValue(self.PITCH)
+
+
+    def getAcceleration(self):
+        return self.getGyroValue(self.ACCELERATION)
+
+
+    def getRate(self):
+        return self.getGyroValue(self.RATE)
+
+
+    def isConnected(self):
+        '''Whether the navX is connected.'''
+
+        if self.connectedLoop != self.loop:
+            self.connected = self.navX.isConnected()
+            self.connectedLoop = self.loop
+
+        return self.connected
@@ -0,0 +1,55 @@
+'''
+Decides when a position move has arrived, using the error and the velocity of
+every motor from the same sensor snapshot.
+
+A move has settled when every motor is within tolerance of its target and
+moving slower than the tolerance per second. If DriveTrain/blendTime is set,
+a move also counts as arrived once every motor is heading toward its target
+and will reach it within that many seconds at its current speed. The next
+move in a sequence can then begin while the robot is still moving, instead of
+waiting for it to stop.
+'''
+
+from .config import Config
+
+
+class SettleDetector:
+
+    '''How many loops in a row a move must look settled.'''
+    confirmations = 2
+
+    def __init__(self):
+        self.blendTime = Config('DriveTrain/blendTime', 0)
+        self.reset()
+
+
+    def reset(self):
+        self.count = 0
+
+
+    def update(self, targets, positions, speeds, tolerance):
+        '''
+        Returns whether the move has arrived. Speeds are in ticks per 100 ms,
+        as the Talons report them. This should be called once per loop.
+        '''
+
+        lookahead = self.blendTime.f
+        settleSpeed = tolerance / 10
+
+        for target, position, speed in zip(targets, positions, speeds):
+            error = target - position
+            if abs(error) <= tolerance and abs(speed) <= settleSpeed:
+                continue
+
+            if lookahead <= 0 or error * speed <= 0:
+                self.count = 0
+                return False
+
+            '''Ticks per second is ten times ticks per 100 ms.'''
+            if abs(error) > abs(speed) * 10 * lookahead:
+                self.count = 0
+                return False
+
+        self.count += 1
+
+        return self.count >= self.confirmations
@@ -0,0 +1,42 @@
+'''
+Measures how long each phase of robot startup takes. This should be the first
+module imported by robot.py, so that the time spent importing everything else is
+counted. Call mark() at the end of each phase and report() once startup is
+complete. The report is printed to the console and sent to the Startup table in
+NetworkTables, so startup times can be compared between versions of the code.
+'''
+
+import time
+
+start = time.perf_counter()
+last = start
+phases = []
+
+
+def mark(name):
+    '''
+    Record the time since the previous mark as the named phase. Each phase is
+    only recorded once, since robot.py is executed a second time when commands
+    import it as the robot module.
+    '''
+
+    global last
+
+    if name in [phase for phase, duration in phases]:
+        return
+
+    now = time.perf_counter()
+    phases.append((name, now - last))
+    last = now
+
+
+def report():
+    from . import ntpublisher
+
+    for name, duration in phases:
+        print('Startup: %s took %.1f ms' % (name, duration * 1000))
+        ntpublisher.put('Startup', name, duration * 1000, 'putNumber')
+
+    total = last - start
+    print('Startup: total %.1f ms' % (total * 1000))
+    ntpublisher.put('Startup', 'total', total * 1000, 'putNumber')
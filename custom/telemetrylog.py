@@ -0,0 +1,110 @@
+'''
+Describes the file format written by the Telemetry subsystem, and loads those
+files for analysis. This module does not depend on wpilib, so it can be used on
+any computer with NumPy installed:
+
+    python3 -m custom.telemetrylog logs/telemetry-20190301-134500.bin
+
+A log starts with MAGIC, followed by the number of columns as an unsigned short.
+Each column is then described by the length of its name as an unsigned byte and
+its UTF-8 name. All values are little endian doubles.
+
+Each motor's error is its closed loop target minus its velocity in Velocity
+mode, or minus its position in Position and MotionMagic modes. In any other
+mode there is no target, and the error is NaN.
+
+The rest of the file is made of blocks. Each block starts with the number of
+rows it contains as an unsigned int, followed by every value of the first
+column, then every value of the second column, and so on. Because the columns
+are contiguous, they can be used directly from a memory-mapped file.
+'''
+
+import mmap, struct, sys
+
+MAGIC = b'PYBOTTLM1'
+
+columnCount = struct.Struct('<H')
+nameLength = struct.Struct('<B')
+blockHeader = struct.Struct('<I')
+valueSize = 8
+
+
+def getColumns(motorCount):
+    '''The names of the columns recorded for a drive with the given motors.'''
+
+    columns = ['time']
+    for motor in range(motorCount):
+        for field in ['position', 'velocity', 'error', 'output']:
+            columns.append('motor%d/%s' % (motor, field))
+
+    columns.extend(['yaw', 'pitch', 'acceleration'])
+
+    return columns
+
+
+def writeHeader(file, columns):
+    file.write(MAGIC)
+    file.write(columnCount.pack(len(columns)))
+    for name in columns:
+        encoded = name.encode('utf-8')
+        file.write(nameLength.pack(len(encoded)))
+        file.write(encoded)
+
+
+def loadLog(path):
+    '''
+    Returns a dict mapping each column name to a NumPy array holding every
+    value recorded in the log.
+    '''
+
+    import numpy
+
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('%s is not a telemetry log' % path)
+
+    offset = len(MAGIC)
+    count, = columnCount.unpack_from(data, offset)
+    offset += columnCount.size
+
+    columns = []
+    for i in range(count):
+        length, = nameLength.unpack_from(data, offset)
+        offset += nameLength.size
+        columns.append(bytes(data[offset:offset + length]).decode('utf-8'))
+        offset += length
+
+    chunks = {name: [] for name in columns}
+    while offset + blockHeader.size <= len(data):
+        rows, = blockHeader.unpack_from(data, offset)
+        offset += blockHeader.size
+
+        if offset + rows * count * valueSize > len(data):
+            '''The last block was not completely written.'''
+            break
+
+        for name in columns:
+            chunks[name].append(
+                numpy.frombuffer(data, '<f8', rows, offset)
+            )
+            offset += rows * valueSize
+
+    return {
+        name: numpy.concatenate(arrays) if arrays else numpy.empty(0)
+        for name, arrays in chunks.items()
+    }
+
+
+if __name__ == '__main__':
+    for name, values in loadLog(sys.argv[1]).items():
+        if len(values) == 0:
+            print('%s: empty' % name)
+        else:
+            print('%s: %d samples, %f to %f' % (
+                name,
+                len(values),
+                values.min(),
+                values.max()
+            ))
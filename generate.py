@@ -25,7 +25,7 @@ def generateSubsystem():
 
     module = subsystem.lower()
 
-    if hasattr(robot, module):
+    if module in getSubsystemNames():
         error('There is already a subsystem named %s' % module)
 
     with open('subsystems/%s.py' % module, 'w') as f:
@@ -46,14 +46,16 @@ class {subsystem}(Subsystem):
     with open('robot.py', 'r') as f:
         init = f.read()
 
-    imports = re.compile(
-        '(from\s+subsystems\.\w+\s+import\s+[A-Z]\w+\s+as\s+\w+\s*)+'
+    registry = re.compile(
+        r'(subsystemRegistry\s*=\s*\[.*?)(\n\])',
+        re.DOTALL
+    )
+    entry = "\n    ('%s', 'subsystems.%s', '%s'),"
+    init = registry.sub(
+        lambda match: match[1] + entry % (module, module, subsystem) + match[2],
+        init,
+        count=1
     )
-    match = imports.search(init)
-
-    old = match[0].strip()
-    new = '%s\nfrom subsystems.%s import %s as %s'
-    init = init.replace(old, new % (old, module, subsystem, module))
 
     with open('robot.py', 'w') as f:
         f.write(init)
@@ -75,7 +77,7 @@ class {subsystem}(Subsystem):
         resetcommand = f.read()
 
     requires = re.compile(
-        '(self\.requires\(robot.\w+\)\s*)+'
+        r'(self\.requires\(robot.\w+\)\s*)+'
     )
     match = requires.search(resetcommand)
 
@@ -163,7 +165,7 @@ def generateCommand():
     requirements = subsystem.strip().lower().split()
 
     for subsystem in requirements:
-        if not hasattr(robot, subsystem):
+        if subsystem not in getSubsystemNames():
             error('Unknown subsystem %s' % subsystem)
 
     if command == 'DefaultCommand':
@@ -249,6 +251,10 @@ def generateCommand():
     print('Created command %s' % command)
 
 
+def getSubsystemNames():
+    return [name for name, path, className in robot.subsystemRegistry]
+
+
 def error(msg):
     print('\033[91m%s\033[0m' % msg)
     sys.exit()
@@ -15,3 +15,9 @@ drivetrain.frontLeftMotorID = 1
 drivetrain.frontRightMotorID = 3
 drivetrain.backLeftMotorID = 2
 drivetrain.backRightMotorID = 4
+
+'''
+Analog inputs for distance sensors. Add frontSensorID or rearSensorID when a
+sensor is attached.
+'''
+rangesensors = PortsList()
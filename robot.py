@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+from custom import startup
+
 import wpilib.command
 wpilib.command.Command.isFinished = lambda x: False
 
@@ -7,31 +9,68 @@ from commandbased import CommandBasedRobot
 from wpilib._impl.main import run
 from wpilib import RobotBase
 
-from custom import driverhud
-import controller.layout
-import subsystems
-import shutil, sys
+import importlib, shutil, sys, time
 
-from wpilib.command import Subsystem
+'''
+Every subsystem, in the order they are created. Each entry gives the name the
+subsystem is stored under in this module, the module that defines it, and its
+class name. Subsystem modules import the motor controller and sensor
+libraries, so they are not imported until robotInit.
+'''
+subsystemRegistry = [
+    ('monitor', 'subsystems.monitor', 'Monitor'),
+    ('drivetrain', 'subsystems.drivetrain', 'DriveTrain'),
+    ('odometry', 'subsystems.odometry', 'Odometry'),
+    ('telemetry', 'subsystems.telemetry', 'Telemetry'),
+    ('rangesensors', 'subsystems.rangesensors', 'RangeSensors'),
+]
 
-from subsystems.monitor import Monitor as monitor
-from subsystems.drivetrain import DriveTrain as drivetrain
+startup.mark('imports')
 
 class KryptonBot(CommandBasedRobot):
     '''Implements a Command Based robot design'''
 
     def robotInit(self):
-        '''Set up everything we need for a working robot.'''
+        '''
+        Set up everything we need for a working robot. Modules that are only
+        used once the robot is running are imported here rather than at the
+        top of the file, since this file is imported a second time when
+        commands import it as the robot module.
+        '''
+
+        global alerts, commandtrace, driverhud, ntpublisher, profiler
+        global genericcontroller
+
+        from custom import alerts, commandtrace, driverhud, ntpublisher
+        from custom import profiler
+        from controller import genericcontroller
 
         if RobotBase.isSimulation():
             import mockdata
 
-        self.subsystems()
+        ntpublisher.start()
+
+        subsystems = self.subsystems()
+        if profiler.isEnabled():
+            profiler.enable(subsystems)
+
+        if commandtrace.isEnabled():
+            commandtrace.enable(sys.modules['robot'].drivetrain.outputs)
+
+        startup.mark('subsystems')
+
+        import controller.layout
         controller.layout.init()
+        startup.mark('controllers')
+
         driverhud.init()
+        startup.mark('dashboard')
 
         from commands.startupcommandgroup import StartUpCommandGroup
         StartUpCommandGroup().start()
+        startup.mark('startup commands')
+
+        startup.report()
 
 
     def autonomousInit(self):
@@ -46,24 +85,60 @@ class KryptonBot(CommandBasedRobot):
         driverhud.showInfo("Starting %s" % auton)
 
 
+    def commandPeriodic(self):
+        '''
+        Runs the scheduler once per loop in every mode. Controllers and
+        sensors are read fresh for each loop, and the motor outputs that
+        commands staged during the loop are sent as a single batch.
+        '''
+
+        start = time.perf_counter()
+
+        genericcontroller.updateAll()
+
+        robot = sys.modules['robot']
+        robot.drivetrain.invalidateSensors()
+
+        super().commandPeriodic()
+
+        robot.drivetrain.flushOutputs()
+        alerts.publish()
+
+        commandtrace.endLoop()
+        profiler.endLoop(time.perf_counter() - start)
+
+    autonomousPeriodic = commandPeriodic
+    teleopPeriodic = commandPeriodic
+    disabledPeriodic = commandPeriodic
+
+
     def handleCrash(self, error):
         super().handleCrash()
-        driverhud.showAlert('Fatal Error: %s' % error)
+        driverhud.showAlert('Fatal Error: %s' % error, severity=alerts.ERROR)
+        alerts.publish()
+        ntpublisher.flush()
 
 
     @classmethod
     def subsystems(cls):
-        vars = globals()
-        module = sys.modules['robot']
-        for key, var in vars.items():
+        '''Create every subsystem and return them in a list.'''
+
+        '''
+        Commands find subsystems through the robot module, which is not the
+        same module as this one when robot.py is run as a script.
+        '''
+        module = importlib.import_module('robot')
+        created = []
+        for key, path, className in subsystemRegistry:
+            subsystem = getattr(importlib.import_module(path), className)
             try:
-                if issubclass(var, Subsystem) and var is not Subsystem:
-                    try:
-                        setattr(module, key, var())
-                    except TypeError as e:
-                        raise ValueError(f'Could not instantiate {key}') from e
-            except TypeError:
-                pass
+                setattr(module, key, subsystem())
+            except TypeError as e:
+                raise ValueError(f'Could not instantiate {key}') from e
+
+            created.append(getattr(module, key))
+
+        return created
 
 
 if __name__ == '__main__':
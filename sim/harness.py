@@ -0,0 +1,152 @@
+'''
+Runs the robot program without a robot, driver station or real time. The
+Talons and navX are replaced with the stubs in sim.stubs, the FPGA clock is
+replaced with a simulated clock that only moves when the simulation steps, and
+the robot is always considered enabled.
+
+Only one SimulatedRobot should be created per process, since the scheduler and
+the robot module's subsystems are shared by the whole program.
+'''
+
+import time
+
+import wpilib
+from wpilib import RobotState, Timer
+from wpilib.command import Scheduler
+
+from .stubs import FakeTalon, FakeAHRS
+
+
+class SimClock:
+    '''A clock that only moves when told to.'''
+
+    def __init__(self):
+        self.time = 0.0
+
+
+    def now(self):
+        return self.time
+
+
+class ScriptedAxis:
+    '''A joystick axis whose value is a function of simulated time.'''
+
+    def __init__(self, clock, script):
+        self.clock = clock
+        self.script = script
+
+
+    def get(self):
+        return self.script(self.clock.now())
+
+
+class SimulatedRobot:
+    '''KryptonBot running against stubbed hardware.'''
+
+    period = 0.02
+
+    def __init__(self):
+        self.clock = SimClock()
+        self.enabled = True
+
+        Timer.getFPGATimestamp = staticmethod(self.clock.now)
+        RobotState.isDisabled = staticmethod(lambda: not self.enabled)
+        RobotState.isEnabled = staticmethod(lambda: self.enabled)
+
+        '''Start from the defaults in the code, not a saved snapshot.'''
+        from custom import config
+        config.snapshotPath = None
+        config.Config._snapshot.clear()
+
+        import subsystems.basedrive as basedrive
+        basedrive.WPI_TalonSRX = FakeTalon
+        basedrive.AHRS = FakeAHRS
+        FakeTalon.instances.clear()
+
+        import robot
+        self.module = robot
+
+        '''
+        Skip RobotBase.__init__, which would start a NetworkTables server and
+        stop several simulations from running side by side.
+        '''
+        self.robot = robot.KryptonBot.__new__(robot.KryptonBot)
+        self.robot.ds = wpilib.DriverStation.getInstance()
+        self.robot.scheduler = Scheduler.getInstance()
+        self.robot.robotInit()
+
+        '''Dashboard updates are sent by tick(), at a predictable time.'''
+        from custom import ntpublisher
+        ntpublisher.stop()
+        self.publisher = ntpublisher
+
+        self.motors = list(FakeTalon.instances)
+        self.navX = robot.drivetrain.navX
+
+        '''If set, moves the hardware instead of the ideal plant in the stubs.'''
+        self.model = None
+
+
+    def tick(self):
+        '''
+        Run one loop of the robot program, then advance the hardware and the
+        clock. Returns how long the robot program took, in seconds.
+        '''
+
+        start = time.perf_counter()
+        self.robot.commandPeriodic()
+        duration = time.perf_counter() - start
+
+        if self.model is None:
+            for motor in self.motors:
+                motor.step(self.period)
+        else:
+            self.model.step(self.period)
+
+        self.publisher.flush()
+        self.clock.time += self.period
+
+        return duration
+
+
+    def usePhysics(self, **options):
+        '''
+        Move the hardware with the physics model in sim.drivetrainmodel. Any
+        options are passed on to the model.
+        '''
+
+        from .drivetrainmodel import DrivetrainModel
+
+        self.model = DrivetrainModel(self.module.drivetrain, **options)
+
+
+    def setConfig(self, key, value):
+        '''
+        Change a Config value immediately. Going through NetworkTables would
+        apply the change on a listener thread at an unpredictable time.
+        '''
+
+        from custom.config import Config
+
+        config = Config(key)
+        Config._store(config.key, value)
+
+
+    def getCANWrites(self):
+        return sum(motor.canWrites for motor in self.motors)
+
+
+    def getCANReads(self):
+        return sum(motor.canReads for motor in self.motors)
+
+
+    def setAxes(self, **scripts):
+        '''
+        Drive logical axes from functions of time, for example
+        setAxes(driveY=lambda t: 0.5).
+        '''
+
+        from controller import logicalaxes
+
+        for name, script in scripts.items():
+            setattr(logicalaxes, name, ScriptedAxis(self.clock, script))
@@ -0,0 +1,204 @@
+'''
+Stand-ins for the Talon SRX and navX, for running the robot program headless.
+Each Talon counts the calls that would become CAN traffic on a real robot, so
+benchmarks can report how busy the bus would be.
+
+The stubs implement an ideal plant: velocity setpoints are reached instantly
+and Motion Magic moves at its cruise velocity. For realistic motion, use the
+model in sim.drivetrainmodel instead of calling step().
+'''
+
+from ctre import ControlMode
+
+
+class FakeTalon:
+    '''Replaces WPI_TalonSRX. Unknown set and config calls are accepted.'''
+
+    instances = []
+
+    '''Ticks per 100 ms at full percent output, for the ideal plant.'''
+    freeSpeed = 1000
+
+    def __init__(self, id):
+        self.id = id
+        self.mode = ControlMode.PercentOutput
+        self.setpoint = 0
+        self.position = 0.0
+        self.velocity = 0.0
+        self.output = 0.0
+        self.current = 0.0
+        self.cruiseVelocity = 0
+        self.acceleration = 0
+        self.profile = 0
+        self.gains = {}
+        self.leader = None
+
+        self.canWrites = 0
+        self.canReads = 0
+
+        FakeTalon.instances.append(self)
+
+
+    def set(self, mode, value):
+        self.canWrites += 1
+        self.mode = mode
+        self.setpoint = value
+
+
+    def stopMotor(self):
+        self.canWrites += 1
+        self.mode = ControlMode.PercentOutput
+        self.setpoint = 0
+
+
+    def follow(self, leader):
+        self.canWrites += 1
+        self.leader = leader
+
+
+    def selectProfileSlot(self, slot, pidIdx):
+        self.canWrites += 1
+        self.profile = slot
+
+
+    def configMotionCruiseVelocity(self, velocity, timeout=0):
+        self.canWrites += 1
+        self.cruiseVelocity = velocity
+
+
+    def configMotionAcceleration(self, acceleration, timeout=0):
+        self.canWrites += 1
+        self.acceleration = acceleration
+
+
+    def _configGain(self, name, slot, value):
+        self.canWrites += 1
+        self.gains[(name, slot)] = value
+
+
+    def config_kP(self, slot, value, timeout=0):
+        self._configGain('P', slot, value)
+
+
+    def config_kI(self, slot, value, timeout=0):
+        self._configGain('I', slot, value)
+
+
+    def config_kD(self, slot, value, timeout=0):
+        self._configGain('D', slot, value)
+
+
+    def config_kF(self, slot, value, timeout=0):
+        self._configGain('F', slot, value)
+
+
+    def config_IntegralZone(self, slot, value, timeout=0):
+        self._configGain('IZone', slot, value)
+
+
+    def __getattr__(self, name):
+        '''Any other setter or config call is counted and ignored.'''
+
+        if name.startswith(('set', 'config', 'reverse', 'enable')):
+            def write(*args, **kwargs):
+                self.canWrites += 1
+
+            return write
+
+        raise AttributeError(name)
+
+
+    def getSelectedSensorPosition(self, pidIdx=0):
+        self.canReads += 1
+        return int(self.position)
+
+
+    def getSelectedSensorVelocity(self, pidIdx=0):
+        self.canReads += 1
+        return int(self.velocity)
+
+
+    def getClosedLoopTarget(self, pidIdx=0):
+        self.canReads += 1
+        if self.mode in (ControlMode.Velocity, ControlMode.MotionMagic):
+            return self.setpoint
+
+        return 0
+
+
+    def getMotorOutputPercent(self):
+        self.canReads += 1
+        return self.output
+
+
+    def getSupplyCurrent(self):
+        self.canReads += 1
+        return self.current
+
+
+    def step(self, dt):
+        '''Advance the motor by dt seconds.'''
+
+        if self.leader is not None:
+            self.velocity = self.leader.velocity
+        elif self.mode == ControlMode.Velocity:
+            self.velocity = self.setpoint
+        elif self.mode == ControlMode.MotionMagic:
+            remaining = self.setpoint - self.position
+            limit = abs(self.cruiseVelocity) * 10 * dt
+            move = max(-limit, min(limit, remaining))
+            self.velocity = move / dt / 10
+        else:
+            self.velocity = self.setpoint * self.freeSpeed
+
+        self.output = max(-1, min(1, self.velocity / self.freeSpeed))
+        self.position += self.velocity * 10 * dt
+
+
+class FakeAHRS:
+    '''Replaces the navX. Its readings are set by whatever drives the sim.'''
+
+    def __init__(self):
+        self.angle = 0.0
+        self.adjustment = 0.0
+        self.pitch = 0.0
+        self.acceleration = 0.0
+        self.rate = 0.0
+        self.connected = True
+
+
+    @classmethod
+    def create_spi(cls, *args, **kwargs):
+        return cls()
+
+
+    def reset(self):
+        self.angle = 0.0
+
+
+    def setAngleAdjustment(self, adjustment):
+        self.adjustment = adjustment
+
+
+    def getAngle(self):
+        return self.angle + self.adjustment
+
+
+    def getYaw(self):
+        return (self.getAngle() + 180) % 360 - 180
+
+
+    def getRate(self):
+        return self.rate
+
+
+    def getPitch(self):
+        return self.pitch
+
+
+    def getWorldLinearAccelY(self):
+        return self.acceleration
+
+
+    def isConnected(self):
+        return self.connected
@@ -0,0 +1,95 @@
+'''
+Runs an autonomous routine in the physics simulation with many sets of
+parameters, in parallel across processes. Each run happens in a fresh process,
+since a SimulatedRobot cannot be reused.
+
+A routine is named as 'module:function', where the function takes no arguments
+and returns the command to run. Parameters are a dict that may contain Config
+keys and their values, and PID gains for a Talon profile as
+'Speed/P', 'Position/D' and so on.
+
+For example, to try several position P values:
+
+    python3 -m sim.sweep sim.sweep:demoRoutine Position/P 0.5 1 2 4
+'''
+
+from multiprocessing import Pool
+import importlib, sys
+
+'''Talon profile slot for each PID table, matching BaseDrive._publishPID.'''
+profiles = {'Speed': 0, 'Position': 1}
+
+
+def runAutonomous(routine, params, duration=15):
+    '''
+    Simulate the routine with the given parameters for up to duration seconds
+    of simulated time. Returns when it finished, or None if it did not, and
+    the final odometry pose.
+    '''
+
+    from .harness import SimulatedRobot
+
+    sim = SimulatedRobot()
+    sim.usePhysics()
+
+    for key, value in params.items():
+        table, _, gain = key.partition('/')
+        if table in profiles and gain:
+            for talon in sim.module.drivetrain.activeMotors:
+                talon.gains[(gain, profiles[table])] = value
+        else:
+            sim.setConfig(key, value)
+
+    module, function = routine.split(':')
+    command = getattr(importlib.import_module(module), function)()
+    command.start()
+
+    finished = None
+    sim.tick()
+    while sim.clock.now() < duration:
+        sim.tick()
+        if not command.isRunning():
+            finished = sim.clock.now()
+            break
+
+    return {
+        'params': params,
+        'finished': finished,
+        'pose': sim.module.odometry.getPose(),
+    }
+
+
+def _run(job):
+    return runAutonomous(*job)
+
+
+def sweep(routine, paramSets, processes=None):
+    '''Run the routine once for each parameter set and return the results.'''
+
+    with Pool(processes, maxtasksperchild=1) as pool:
+        return pool.map(_run, [(routine, params) for params in paramSets])
+
+
+def demoRoutine():
+    from wpilib.command import CommandGroup
+    from commands.drivetrain.movecommand import MoveCommand
+    from commands.drivetrain.turncommand import TurnCommand
+
+    auton = CommandGroup('Sweep Demo')
+    auton.addSequential(MoveCommand(60))
+    auton.addSequential(TurnCommand(90))
+    auton.addSequential(MoveCommand(24))
+
+    return auton
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 4:
+        print(__doc__.strip())
+        sys.exit(2)
+
+    routine, key = sys.argv[1:3]
+    paramSets = [{key: float(value)} for value in sys.argv[3:]]
+
+    for result in sweep(routine, paramSets):
+        print(result)
@@ -1,12 +1,19 @@
 from wpilib.command import Subsystem
 
-import math
+from collections import deque
+import math, threading
 
 from networktables import NetworkTables
 from ctre import ControlMode, NeutralMode, WPI_TalonSRX, FeedbackDevice
 from navx import AHRS
 
 from custom.config import Config
+from custom.derivedvalue import DerivedValue
+from custom.motionlimiter import MotionLimiter
+from custom.motoroutputs import MotorOutputCache
+from custom.sensorsnapshot import SensorSnapshot
+from custom.kinematics import normalize
+from custom import driverhud, ntpublisher
 import ports
 
 
@@ -17,6 +24,21 @@ class BaseDrive(Subsystem):
     without knowing what type of drive system we have should be implemented here.
     '''
 
+    '''Subclasses should describe how chassis motion maps to their wheels.'''
+    kinematics = None
+
+    '''The Talon methods that set each gain from the dashboard.'''
+    gainSetters = {
+        'P': 'config_kP',
+        'I': 'config_kI',
+        'D': 'config_kD',
+        'F': 'config_kF',
+        'IZone': 'config_IntegralZone',
+    }
+
+    '''The control mode that uses each PID profile.'''
+    profileModes = {0: ControlMode.Velocity, 1: ControlMode.MotionMagic}
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -49,21 +71,72 @@ class BaseDrive(Subsystem):
         self.activeMotors = []
         self._configureMotors()
 
+        '''Only send CAN frames when a motor's output actually changes.'''
+        self.outputs = MotorOutputCache(self.activeMotors)
+        self.canTable = 'DriveTrain/CAN'
+
         '''Initialize the navX MXP'''
         self.navX = AHRS.create_spi()
+
+        '''Read each sensor only once per loop.'''
+        self.sensors = SensorSnapshot(self.activeMotors, self.navX)
+
         self.resetGyro()
         self.flatAngle = 0
 
-        '''A record of the last arguments to move()'''
+        '''
+        The target of the last call to move(), after the deadband, and the
+        last target whose outputs were sent.
+        '''
+        self.moveTargets = None
         self.lastInputs = None
 
+        '''Where the last call to setPositions() sent each motor.'''
+        self.targetPositions = None
+        self.motionSettings = None
+        self.cruiseVelocity = None
+
+        '''Limits acceleration and jerk of the inputs to move().'''
+        self.limiter = MotionLimiter(self.sensors)
+
         self.setUseEncoders()
         self.maxSpeed = Config('DriveTrain/maxSpeed')
         self.speedLimit = Config('DriveTrain/normalSpeed')
         self.deadband = Config('DriveTrain/deadband', 0.05)
         self.maxPercentVBus = 1
 
-        '''Allow changing CAN Talon settings from dashboard'''
+        '''
+        Unit conversions depend on Config values that rarely change, so they
+        are only recalculated when one of them does.
+        '''
+        self.ticksPerInch = DerivedValue(
+            lambda diameter, ticks: ticks / (math.pi * diameter),
+            Config('DriveTrain/wheelDiameter'),
+            Config('DriveTrain/ticksPerRotation', 4096)
+        )
+
+        '''
+        In order to avoid having a separate ticksPerDegree, we calculate it
+        based on the width of the robot base and how much the wheels slip.
+        '''
+        self.ticksPerDegree = DerivedValue(
+            lambda diameter, ticks, width, slip:
+                width * ticks * slip / (360 * diameter),
+            Config('DriveTrain/wheelDiameter'),
+            Config('DriveTrain/ticksPerRotation', 4096),
+            Config('DriveTrain/width'),
+            Config('DriveTrain/slip', 1.2)
+        )
+
+        '''
+        Allow changing CAN Talon settings from dashboard. Changes are staged
+        and sent from periodic(), so they never arrive in the middle of a move.
+        '''
+        self.pidLock = threading.Lock()
+        self.pendingPID = {}
+        self.pidAlerts = deque()
+        self.appliedPID = {}
+        self.pidTables = {}
         self._publishPID('Speed', 0)
         self._publishPID('Position', 1)
 
@@ -79,75 +152,183 @@ class BaseDrive(Subsystem):
         self.setDefaultCommand(DriveCommand(self.speedLimit))
 
 
-    def move(self, x, y, rotate):
-        '''Turns coordinate arguments into motor outputs.'''
-
+    def periodic(self):
         '''
-        Short-circuits the rather expensive movement calculations if the
-        coordinates have not changed.
+        Send staged PID changes and report how much CAN traffic the output
+        cache is saving.
         '''
-        if [x, y, rotate] == self.lastInputs:
-            return
 
-        self.lastInputs = [x, y, rotate]
+        self._applyPID()
+        self.outputs.publish(self.canTable)
+
+        '''Alerts are not thread safe, so they are raised here.'''
+        while self.pidAlerts:
+            driverhud.showAlert(self.pidAlerts.popleft())
+
+
+    def move(self, x, y, rotate):
+        '''
+        Turns coordinate arguments into motor outputs. The outputs approach
+        the new target once per loop, when they are flushed, until they reach
+        it. Commands only need to call this when the target changes.
+        '''
 
         '''Prevent drift caused by small input values'''
         if self.useEncoders:
-            x = math.copysign(max(abs(x) - self.deadband, 0), x)
-            y = math.copysign(max(abs(y) - self.deadband, 0), y)
-            rotate = math.copysign(max(abs(rotate) - self.deadband, 0), rotate)
+            deadband = self.deadband.f
+            x = math.copysign(max(abs(x) - deadband, 0), x)
+            y = math.copysign(max(abs(y) - deadband, 0), y)
+            rotate = math.copysign(max(abs(rotate) - deadband, 0), rotate)
 
-        speeds = self._calculateSpeeds(x, y, rotate)
+        self.moveTargets = [x, y, rotate]
+        self.targetPositions = None
 
-        '''Prevent speeds > 1'''
-        maxSpeed = 0
-        for speed in speeds:
-            maxSpeed = max(abs(speed), maxSpeed)
 
-        if maxSpeed > 1:
-            speeds = [x / maxSpeed for x in speeds]
+    def setChassisVelocity(self, forward, rotate, strafe=0):
+        '''
+        Drive at the given speeds, in inches per second and degrees per second
+        clockwise. Unlike move(), the speeds are not limited by the current
+        speed limit or the MotionLimiter, so the caller is responsible for
+        keeping them reasonable, usually by following a profile.
+        '''
 
-        '''Use speeds to feed motor output.'''
-        if self.useEncoders:
-            if not any(speeds):
-                '''
-                When we are trying to stop, clearing the I accumulator can
-                reduce overshooting, thereby shortening the time required to
-                come to a stop.
-                '''
-                for motor in self.activeMotors:
-                    motor.setIntegralAccumulator(0, 0, 0)
+        if not self.useEncoders:
+            raise RuntimeError('Cannot set velocity. Encoders are disabled.')
 
-            for motor, speed in zip(self.activeMotors, speeds):
-                motor.set(ControlMode.Velocity, speed * self.speedLimit)
+        '''Talon velocities are measured in ticks per 100 ms.'''
+        ticksPerInch = self.ticksPerInch.get() / 10
+        speeds = self.kinematics.toWheelSpeeds(
+            strafe * ticksPerInch,
+            forward * ticksPerInch,
+            rotate * self.ticksPerDegree.get() / 10
+        )
 
-        else:
-            for motor, speed in zip(self.activeMotors, speeds):
-                motor.set(ControlMode.PercentOutput, speed * self.maxPercentVBus)
+        for id, speed in enumerate(speeds):
+            self.outputs.set(id, ControlMode.Velocity, speed)
+
+        self.moveTargets = None
+        self.lastInputs = None
+        self.targetPositions = None
+
+
+    def setPercentOutput(self, output):
+        '''
+        Drive straight at the given percent output, without using encoders,
+        the speed limit or the MotionLimiter. Used to measure how the drive
+        responds to a step, which limiting would smooth away.
+        '''
+
+        speeds = self.kinematics.toWheelSpeeds(0, output, 0)
+        for id, speed in enumerate(speeds):
+            self.outputs.set(id, ControlMode.PercentOutput, speed)
+
+        self.moveTargets = None
+        self.lastInputs = None
+        self.targetPositions = None
+
+
+    def invalidateSensors(self):
+        '''
+        Discard this loop's sensor readings. This should be called once per
+        loop, before the scheduler runs.
+        '''
+
+        self.sensors.invalidate()
+
+
+    def flushOutputs(self):
+        '''
+        Send any motor outputs staged during this loop. This should be called
+        once per loop, after the scheduler has run.
+        '''
+
+        if self.moveTargets is not None:
+            self._stepMove()
+
+        self.outputs.flush()
 
 
     def setPositions(self, positions):
         '''
         Have the motors move to the given positions. There should be one
         position per active motor. Extra positions will be ignored.
+
+        The motors are not stopped first, so a new move blends smoothly out of
+        one that is still under way. Motion Magic limits the acceleration, so
+        the MotionLimiter is not used.
         '''
 
         if not self.useEncoders:
             raise RuntimeError('Cannot set position. Encoders are disabled.')
 
-        self.stop()
-        for motor, position in zip(self.activeMotors, positions):
-            motor.selectProfileSlot(1, 0)
-            motor.configMotionCruiseVelocity(int(self.speedLimit), 0)
-            motor.configMotionAcceleration(int(self.speedLimit), 0)
-            motor.set(ControlMode.MotionMagic, position)
+        '''Only reconfigure Motion Magic when the speed limit has changed.'''
+        speed = int(self.speedLimit)
+        if self.motionSettings != speed:
+            self.motionSettings = speed
+            for motor in self.activeMotors:
+                motor.selectProfileSlot(1, 0)
+                motor.configMotionAcceleration(speed, 0)
+
+            self.outputs.countDirect(2 * len(self.activeMotors))
+
+        self.setCruiseVelocity(speed)
+
+        count = len(self.activeMotors)
+        self.targetPositions = list(positions[:count])
+        for id, position in enumerate(self.targetPositions):
+            self.outputs.set(id, ControlMode.MotionMagic, position)
+
+        self.limiter.reset()
+        self.moveTargets = None
+        self.lastInputs = None
+
+
+    def setCruiseVelocity(self, speed):
+        '''
+        Change how fast position moves travel, in ticks per 100 ms. A move
+        that is under way continues at the new speed without restarting.
+        '''
+
+        speed = max(int(speed), 1)
+        if speed == self.cruiseVelocity:
+            return
+
+        self.cruiseVelocity = speed
+        for motor in self.activeMotors:
+            motor.configMotionCruiseVelocity(speed, 0)
+
+        self.outputs.countDirect(len(self.activeMotors))
+
+
+    def getForwardSpeed(self):
+        '''How fast the robot is driving forward, in inches per second.'''
+
+        x, y, rotate = self.kinematics.toChassisSpeeds(self.getSpeeds())
+
+        return y * 10 / self.ticksPerInch.get()
+
+
+    def getTargetPositions(self):
+        '''
+        Where each motor should be. During or after a position move this is
+        the move's target, so consecutive moves do not accumulate error.
+        Otherwise it is the current position.
+        '''
+
+        if self.targetPositions is None:
+            return self.getPositions()
+
+        return list(self.targetPositions)
 
 
     def averageError(self):
         '''Find the average distance between setpoint and current position.'''
+        targets = self.sensors.getTargets()
+        positions = self.sensors.getPositions()
+
         error = 0
-        for motor in self.activeMotors:
-            error += abs(motor.getClosedLoopTarget(0) - motor.getSelectedSensorPosition(0))
+        for target, position in zip(targets, positions):
+            error += abs(target - position)
 
         return error / len(self.activeMotors)
 
@@ -164,7 +345,12 @@ class BaseDrive(Subsystem):
         for motor in self.activeMotors:
             motor.stopMotor()
 
+        self.outputs.countDirect(len(self.activeMotors))
+        self.outputs.invalidate()
+        self.limiter.reset()
+        self.moveTargets = None
         self.lastInputs = None
+        self.targetPositions = None
 
 
     def setProfile(self, profile):
@@ -172,17 +358,18 @@ class BaseDrive(Subsystem):
         for motor in self.activeMotors:
             motor.selectProfileSlot(profile, 0)
 
+        self.outputs.countDirect(len(self.activeMotors))
+        self.motionSettings = None
+        self.cruiseVelocity = None
+
 
     def resetPID(self):
         '''Set all PID values to 0 for profiles 0 and 1.'''
-        for motor in self.activeMotors:
-            motor.configClosedLoopRamp(0, 0)
-            for profile in range(2):
-                motor.config_kP(profile, 0, 0)
-                motor.config_kI(profile, 0, 0)
-                motor.config_kD(profile, 0, 0)
-                motor.config_kF(profile, 0, 0)
-                motor.config_IntegralZone(profile, 0, 0)
+
+        self.stagePID(None, 'RampRate', 0)
+        for profile in range(2):
+            for key in self.gainSetters:
+                self.stagePID(profile, key, 0)
 
 
     def resetGyro(self):
@@ -196,12 +383,19 @@ class BaseDrive(Subsystem):
 
         self.navX.reset()
         self.navX.setAngleAdjustment(angle)
+        self.sensors.invalidate()
 
 
     def getAngle(self):
         '''Current gyro reading'''
 
-        return self.navX.getAngle() % 360
+        return self.sensors.getAngle() % 360
+
+
+    def getYawRate(self):
+        '''How fast the robot is turning, in degrees per second clockwise.'''
+
+        return self.sensors.getRate()
 
 
     def getAngleTo(self, targetAngle):
@@ -220,36 +414,73 @@ class BaseDrive(Subsystem):
 
     def inchesToTicks(self, distance):
         '''Converts a distance in inches into a number of encoder ticks.'''
-        rotations = distance / (math.pi * Config('DriveTrain/wheelDiameter'))
 
-        return int(rotations * Config('DriveTrain/ticksPerRotation', 4096))
+        return int(distance * self.ticksPerInch.get())
+
+
+    def inchesToTicksList(self, distances):
+        '''Converts a list of distances in inches into encoder ticks.'''
+
+        ticksPerInch = self.ticksPerInch.get()
+
+        return [int(distance * ticksPerInch) for distance in distances]
+
+
+    def degreesToTicks(self, degrees):
+        '''
+        Converts an angle to turn in place into the number of encoder ticks
+        each wheel must travel.
+        '''
+
+        return degrees * self.ticksPerDegree.get()
+
+
+    def degreesToTicksList(self, angles):
+        '''Converts a list of turn angles into encoder ticks.'''
+
+        ticksPerDegree = self.ticksPerDegree.get()
+
+        return [degrees * ticksPerDegree for degrees in angles]
 
 
     def resetTilt(self):
-        self.flatAngle = self.navX.getPitch()
+        self.flatAngle = self.sensors.getPitch()
 
 
     def getTilt(self):
-        return self.navX.getPitch() - self.flatAngle
+        return self.sensors.getPitch() - self.flatAngle
 
 
     def getAcceleration(self):
         '''Reads acceleration from NavX MXP.'''
-        return self.navX.getWorldLinearAccelY()
+        return self.sensors.getAcceleration()
 
 
     def getSpeeds(self):
         '''Returns the speed of each active motors.'''
-        return [x.getSelectedSensorVelocity(0) for x in self.activeMotors]
+        return self.sensors.getSpeeds()
 
 
     def getPositions(self):
         '''Returns the position of each active motor.'''
-        return [x.getSelectedSensorPosition(0) for x in self.activeMotors]
+        return self.sensors.getPositions()
+
+
+    def getCurrents(self):
+        '''Returns the supply current of each active motor, in amps.'''
+        return self.sensors.getCurrents()
+
+
+    def getOutputs(self):
+        '''Returns the percent output of each active motor.'''
+        return self.sensors.getOutputs()
 
 
     def getFrontClearance(self):
-        '''Override this in drivetrain if a distance sensor is attached.'''
+        '''
+        Override this in drivetrain if a distance sensor is attached. The
+        RangeSensors subsystem checks for the override when it is created.
+        '''
         raise NotImplementedError
 
 
@@ -294,53 +525,168 @@ class BaseDrive(Subsystem):
         self.setUseEncoders(False)
 
 
-    def _publishPID(self, table, profile):
+    def stagePID(self, profile, key, value):
+        '''
+        Queue a PID setting to be sent to the Talons at the next safe point.
+        RampRate is shared by every profile. Unknown keys are ignored, and
+        values that are not finite, non-negative numbers are rejected with an
+        alert. Returns whether the value was staged. This may be called from
+        the NetworkTables listener thread.
+        '''
+
+        if key == 'RampRate':
+            profile = None
+        elif key not in self.gainSetters:
+            return False
+
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = math.nan
+
+        if not math.isfinite(number) or number < 0:
+            self.pidAlerts.append(
+                'Ignoring invalid PID value %s = %s' % (key, value)
+            )
+            return False
+
+        if key == 'IZone':
+            number = int(number)
+
+        with self.pidLock:
+            self.pendingPID[(profile, key)] = number
+
+        return True
+
+
+    def _applyPID(self):
         '''
-        Read the PID value from the first active CAN Talon and publish it to the
-        passed NetworkTable.
+        Send the staged PID settings as one batch per motor. Settings the
+        Talons already have are not sent again, and a profile is left alone
+        while a move that uses it is under way.
         '''
 
-        table = NetworkTables.getTable('DriveTrain/%s' % table)
+        if not self.pendingPID:
+            return
 
-        talon = self.activeMotors[0]
+        with self.pidLock:
+            pending = self.pendingPID
+            self.pendingPID = {}
 
-        # TODO: If CTRE ever gives us back the ability to query PID values, send
-        # them to NetworkTables here. In the meantime, we just persist the last
-        # values that were set via NetworkTables
+        changes = []
+        deferred = {}
+        for (profile, key), value in pending.items():
+            if self.appliedPID.get((profile, key)) == value:
+                continue
 
-        def updatePID(table, key, value, isNew):
-            '''
-            Loops over all active motors and updates the appropriate setting. To
-            avoid using a very long if structure inside the loop, we use getattr
-            to access the methods of the motor by name.
-            '''
+            if self._isMoving(profile):
+                deferred[(profile, key)] = value
+            else:
+                changes.append((profile, key, value))
 
-            table.setPersistent(key)
+        if deferred:
+            with self.pidLock:
+                for setting, value in deferred.items():
+                    self.pendingPID.setdefault(setting, value)
 
-            if key == 'RampRate':
-                for motor in self.activeMotors:
+        for motor in self.activeMotors:
+            for profile, key, value in changes:
+                if key == 'RampRate':
                     motor.configClosedLoopRamp(value, 0)
+                else:
+                    getattr(motor, self.gainSetters[key])(profile, value, 0)
 
-                return
+        self.outputs.countDirect(len(changes) * len(self.activeMotors))
 
-            if key == 'P':
-                for motor in self.activeMotors:
-                    motor.config_kP(1, value, 0)
+        for profile, key, value in changes:
+            self.appliedPID[(profile, key)] = value
 
-                return
+            path = 'DriveTrain/Applied'
+            if profile is not None:
+                path = '%s/%s' % (path, self.pidTables[profile])
 
-            funcs = {
-                'I': 'config_kI',
-                'D': 'config_kD',
-                'F': 'config_kF',
-                'IZone': 'config_IntegralZone'
-            }
+            ntpublisher.put(path, key, value)
 
-            for motor in self.activeMotors:
-                getattr(motor, funcs[key])(0, value, 0)
-                getattr(motor, funcs[key])(1, value, 0)
 
-        table.addSubTableListener(updatePID, localNotify=True)
+    def _isMoving(self, profile):
+        '''
+        Whether the Talons are following a setpoint with the given profile and
+        the wheels are turning. The ramp rate only limits how quickly outputs
+        change, so it is always safe to send.
+        '''
+
+        if profile is None:
+            return False
+
+        if self.profileModes[profile] not in self.outputs.modes:
+            return False
+
+        return max(abs(speed) for speed in self.getSpeeds()) > 10
+
+
+    def _publishPID(self, table, profile):
+        '''
+        Stage changes made to the passed NetworkTable for the given profile.
+        The Talons cannot report their PID values, so the last values set
+        through NetworkTables are persisted instead, and the values actually
+        sent are published to DriveTrain/Applied.
+        '''
+
+        path = 'DriveTrain/%s' % table
+        self.pidTables[profile] = table
+
+        def updatePID(source, key, value, isNew):
+            ntpublisher.setPersistent(path, key)
+            self.stagePID(profile, key, value)
+
+        NetworkTables.getTable(path).addEntryListener(
+            updatePID,
+            immediateNotify=True,
+            localNotify=True
+        )
+
+
+    def _stepMove(self):
+        '''Move the outputs one loop closer to the target of move().'''
+
+        '''
+        Short-circuits the rather expensive movement calculations once the
+        target has been reached and sent.
+        '''
+        targets = self.moveTargets
+        if targets == self.lastInputs and self.limiter.isSettled(targets):
+            return
+
+        self.lastInputs = targets
+
+        '''Change speed no faster than the drive can follow.'''
+        x, y, rotate = self.limiter.calculate(targets)
+
+        '''Prevent speeds > 1'''
+        speeds = normalize(self._calculateSpeeds(x, y, rotate))
+
+        '''Use speeds to feed motor output.'''
+        if self.useEncoders:
+            if not any(speeds):
+                '''
+                When we are trying to stop, clearing the I accumulator can
+                reduce overshooting, thereby shortening the time required to
+                come to a stop.
+                '''
+                for id in range(len(self.activeMotors)):
+                    self.outputs.clearIntegral(id)
+
+            speedLimit = float(self.speedLimit)
+            for id, speed in enumerate(speeds):
+                self.outputs.set(id, ControlMode.Velocity, speed * speedLimit)
+
+        else:
+            for id, speed in enumerate(speeds):
+                self.outputs.set(
+                    id,
+                    ControlMode.PercentOutput,
+                    speed * self.maxPercentVBus
+                )
 
 
     def _configureMotors(self):
@@ -354,4 +700,4 @@ class BaseDrive(Subsystem):
     def _calculateSpeeds(self, x, y, rotate):
         '''Return a speed for each active motor.'''
 
-        raise NotImplementedError()
+        return self.kinematics.toWheelSpeeds(x, y, rotate)
@@ -1,7 +1,7 @@
-import math
 from wpilib.drive.robotdrivebase import RobotDriveBase
 
 from .basedrive import BaseDrive
+from custom.kinematics import MECANUM
 
 class MecanumDrive(BaseDrive):
     '''
@@ -11,6 +11,8 @@ class MecanumDrive(BaseDrive):
     driven.
     '''
 
+    kinematics = MECANUM
+
     def __init__(self, name):
         super().__init__(name)
 
@@ -39,22 +41,9 @@ class MecanumDrive(BaseDrive):
     def _calculateSpeeds(self, x, y, rotate):
         '''Determines what speed each motor should have.'''
 
+        heading = None
         if self.isFieldOriented:
-            '''Fancy math changes x and y based on gyro reading.'''
-            heading = self.getAngle() * math.pi / 180
-
-            cosA = math.cos(heading)
-            sinA = math.sin(heading)
-
-            newX = x * cosA - y * sinA
-            newY = x * sinA + y * cosA
-
-            x = newX
-            y = newY
+            '''Rotate x and y based on gyro reading.'''
+            heading = self.getAngle()
 
-        return [
-            x + y + rotate,
-            x - y + rotate,
-            -x + y + rotate,
-            -x - y + rotate
-        ]
+        return self.kinematics.toWheelSpeeds(x, y, rotate, heading)
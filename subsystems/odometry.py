@@ -0,0 +1,207 @@
+from wpilib.command import Subsystem
+from wpilib import Timer
+
+from array import array
+import math
+
+from custom.calibration import DriveCalibration
+import robot
+
+
+class Odometry(Subsystem):
+    '''
+    Tracks where the robot is on the field. Every loop, the change in each
+    wheel's encoder is turned into chassis motion using the drive train's
+    kinematics, then rotated onto the field using the navX heading. If the navX
+    is disconnected, the heading is estimated from the encoders instead.
+
+    Positions are in inches, with y pointing the way the robot faced when the
+    gyro was last zeroed. Headings are in degrees, clockwise positive, as
+    reported by the navX.
+
+    Recent poses are kept in a fixed size history, so that measurements taken
+    in the past, such as from vision, can be compared against where the robot
+    was at that moment.
+    '''
+
+    '''How many past poses are kept. At 50 a second, about 1.3 s.'''
+    historySize = 64
+
+    '''How many loops pass between calibration reports.'''
+    calibrationInterval = 50
+
+    def __init__(self):
+        super().__init__('Odometry')
+
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self.lastPositions = None
+
+        self.times = array('d', [0.0] * self.historySize)
+        self.xs = array('d', [0.0] * self.historySize)
+        self.ys = array('d', [0.0] * self.historySize)
+        self.headings = array('d', [0.0] * self.historySize)
+        self.count = 0
+
+        '''Learns slip and wheel diameter from how the robot moves.'''
+        self.calibration = DriveCalibration()
+
+
+    def periodic(self):
+        drivetrain = robot.drivetrain
+        positions = drivetrain.getPositions()
+
+        if self.lastPositions is None:
+            self.lastPositions = positions
+            self.heading = drivetrain.sensors.getAngle()
+            return
+
+        deltas = [new - old for new, old in zip(positions, self.lastPositions)]
+        self.lastPositions = positions
+
+        '''
+        Until the wheel diameter and width are in Config, the encoders cannot
+        be converted to distances. The robot can still drive without encoders
+        in the meantime, so just follow the heading.
+        '''
+        try:
+            ticksPerInch = drivetrain.ticksPerInch.get()
+            ticksPerDegree = drivetrain.ticksPerDegree.get()
+        except ZeroDivisionError:
+            ticksPerInch = ticksPerDegree = 0
+
+        if ticksPerInch <= 0 or ticksPerDegree <= 0:
+            self.heading = drivetrain.sensors.getAngle()
+            return
+
+        x, y, rotate = drivetrain.kinematics.toChassisSpeeds(deltas)
+        x /= ticksPerInch
+        y /= ticksPerInch
+
+        encoderDegrees = rotate / ticksPerDegree
+        connected = drivetrain.sensors.isConnected()
+        if connected:
+            heading = drivetrain.sensors.getAngle()
+        else:
+            heading = self.heading + encoderDegrees
+
+        '''Use the heading halfway through the motion.'''
+        midpoint = (self.heading + heading) / 2
+        reset = abs(heading - self.heading) > 90
+        if reset:
+            '''The gyro was reset, so the old heading means nothing.'''
+            midpoint = heading
+        elif connected:
+            self.calibration.addTurn(encoderDegrees, heading - self.heading)
+
+        radians = math.radians(midpoint)
+        cosA = math.cos(radians)
+        sinA = math.sin(radians)
+
+        self.x += x * cosA + y * sinA
+        self.y += y * cosA - x * sinA
+        self.heading = heading
+
+        self._record(Timer.getFPGATimestamp())
+
+        if self.count % self.calibrationInterval == 0:
+            self.calibration.publish()
+
+
+    def getPose(self):
+        '''Returns the current x, y and heading.'''
+
+        return (self.x, self.y, self.heading)
+
+
+    def resetPose(self, x=0, y=0):
+        '''
+        Declare the robot's current position. The heading always comes from the
+        navX, so use the drive train's setGyroAngle() to change it. The history
+        is moved by the same amount, so measurements taken before the reset
+        still line up with it.
+        '''
+
+        self._shiftHistory(x - self.x, y - self.y)
+        self.x = x
+        self.y = y
+
+
+    def getPoseAt(self, timestamp):
+        '''
+        Returns the x, y and heading the robot had at the given FPGA timestamp,
+        interpolating between the recorded poses on either side of it. Times
+        outside the history return the closest recorded pose.
+        '''
+
+        size = min(self.count, self.historySize)
+        if size == 0:
+            return self.getPose()
+
+        '''Index i counts forward from the oldest recorded pose.'''
+        oldest = self.count - size
+
+        def slot(i):
+            return (oldest + i) % self.historySize
+
+        if timestamp <= self.times[slot(0)]:
+            return self._poseAt(slot(0))
+
+        if timestamp >= self.times[slot(size - 1)]:
+            return self._poseAt(slot(size - 1))
+
+        low = 0
+        high = size - 1
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.times[slot(middle)] <= timestamp:
+                low = middle
+            else:
+                high = middle
+
+        before = slot(low)
+        after = slot(high)
+        span = self.times[after] - self.times[before]
+        fraction = (timestamp - self.times[before]) / span if span else 0
+
+        def blend(values):
+            return values[before] + (values[after] - values[before]) * fraction
+
+        return (blend(self.xs), blend(self.ys), blend(self.headings))
+
+
+    def addPositionMeasurement(self, x, y, timestamp):
+        '''
+        Correct the pose using a position measured at the given timestamp. The
+        difference between the measurement and where we thought we were at
+        that time is applied to the current position, and to the recorded
+        history so later measurements are not corrected twice.
+        '''
+
+        oldX, oldY, heading = self.getPoseAt(timestamp)
+        dx = x - oldX
+        dy = y - oldY
+
+        self.x += dx
+        self.y += dy
+        self._shiftHistory(dx, dy)
+
+
+    def _record(self, timestamp):
+        slot = self.count % self.historySize
+        self.times[slot] = timestamp
+        self.xs[slot] = self.x
+        self.ys[slot] = self.y
+        self.headings[slot] = self.heading
+        self.count += 1
+
+
+    def _shiftHistory(self, dx, dy):
+        for slot in range(min(self.count, self.historySize)):
+            self.xs[slot] += dx
+            self.ys[slot] += dy
+
+
+    def _poseAt(self, slot):
+        return (self.xs[slot], self.ys[slot], self.headings[slot])
@@ -0,0 +1,166 @@
+from wpilib.command import Subsystem
+from wpilib import AnalogInput, Timer
+
+from array import array
+import math
+
+from custom.config import Config
+from subsystems.basedrive import BaseDrive
+import ports
+import robot
+
+
+class RangeFilter:
+    '''
+    Smooths the readings of one distance sensor. The last few readings are kept
+    in a ring buffer and their median rejects single bad echoes. The median is
+    then smoothed with an exponential moving average, and the rate at which the
+    smoothed distance shrinks is the closing speed.
+    '''
+
+    '''How many readings the median is taken over.'''
+    size = 5
+
+    '''Weight of each new reading in the moving averages.'''
+    smoothing = 0.3
+
+    def __init__(self, read):
+        self.read = read
+        self.readings = array('d', [0.0] * self.size)
+        self.count = 0
+
+        self.clearance = math.inf
+        self.closingSpeed = 0.0
+        self.lastTime = None
+
+
+    def sample(self, now):
+        '''Take a reading and update the clearance and closing speed.'''
+
+        self.readings[self.count % self.size] = self.read()
+        self.count += 1
+
+        filled = min(self.count, self.size)
+        median = sorted(self.readings[:filled])[filled // 2]
+
+        if self.lastTime is None:
+            self.clearance = median
+            self.lastTime = now
+            return
+
+        dt = now - self.lastTime
+        if dt <= 0:
+            return
+
+        '''
+        Averaging with infinity gives nan, so start over whenever nothing was
+        in range, either before or now.
+        '''
+        if not (math.isfinite(median) and math.isfinite(self.clearance)):
+            self.clearance = median
+            self.closingSpeed = 0.0
+            self.lastTime = now
+            return
+
+        clearance = self.clearance + self.smoothing * (median - self.clearance)
+        speed = (self.clearance - clearance) / dt
+        self.closingSpeed += self.smoothing * (speed - self.closingSpeed)
+
+        self.clearance = clearance
+        self.lastTime = now
+
+
+class RangeSensors(Subsystem):
+    '''
+    Watches the distance sensors at the front and rear of the robot. Which
+    sensors exist is decided once, when the subsystem is created: a sensor is
+    used if its analog port is listed in ports.rangesensors, or if the drive
+    train overrides getFrontClearance or getRearClearance.
+
+    Drive commands ask getSpeedCap() how fast they may go, so the robot slows
+    smoothly as an obstacle gets close rather than stopping suddenly.
+    '''
+
+    def __init__(self):
+        super().__init__('RangeSensors')
+
+        self.inchesPerVolt = Config('RangeSensors/inchesPerVolt', 102.4)
+        self.minClearance = Config('RangeSensors/minClearance', 10)
+        self.timeToCollision = Config('RangeSensors/timeToCollision', 1.0)
+
+        self.filters = {
+            'front': self._createFilter('front', 'getFrontClearance'),
+            'rear': self._createFilter('rear', 'getRearClearance'),
+        }
+
+
+    def _createFilter(self, direction, method):
+        '''Returns a RangeFilter for the sensor, or None if there is not one.'''
+
+        sensorPorts = getattr(ports, 'rangesensors', None)
+        channel = getattr(sensorPorts, '%sSensorID' % direction, None)
+        if channel is not None:
+            sensor = AnalogInput(channel)
+            return RangeFilter(
+                lambda: sensor.getVoltage() * self.inchesPerVolt.f
+            )
+
+        drivetrain = robot.drivetrain
+        if getattr(type(drivetrain), method) is not getattr(BaseDrive, method):
+            return RangeFilter(getattr(drivetrain, method))
+
+        return None
+
+
+    def periodic(self):
+        now = Timer.getFPGATimestamp()
+        for sensor in self.filters.values():
+            if sensor is not None:
+                sensor.sample(now)
+
+
+    def hasSensor(self, direction):
+        '''Whether there is a sensor facing 'front' or 'rear'.'''
+
+        return self.filters[direction] is not None
+
+
+    def getClearance(self, direction):
+        '''Filtered distance to the nearest obstacle, in inches.'''
+
+        sensor = self.filters[direction]
+        if sensor is None:
+            return math.inf
+
+        return sensor.clearance
+
+
+    def getClosingSpeed(self, direction):
+        '''How quickly the obstacle is getting closer, in inches per second.'''
+
+        sensor = self.filters[direction]
+        if sensor is None:
+            return 0.0
+
+        return sensor.closingSpeed
+
+
+    def getSpeedCap(self, direction, speed):
+        '''
+        The fastest the robot may drive toward an obstacle, in inches per
+        second, so that it would take at least RangeSensors/timeToCollision
+        seconds to close the distance down to RangeSensors/minClearance. The
+        robot's current speed is needed to tell how much of the closing speed
+        comes from the obstacle moving toward the robot.
+        '''
+
+        sensor = self.filters[direction]
+        if sensor is None:
+            return math.inf
+
+        room = max(sensor.clearance - self.minClearance.f, 0)
+        cap = room / max(self.timeToCollision.f, 0.1)
+
+        approaching = max(sensor.closingSpeed - abs(speed), 0)
+
+        return max(cap - approaching, 0)
@@ -1,11 +1,14 @@
 from .basedrive import BaseDrive
 from ctre import ControlMode
 from wpilib.drive import RobotDriveBase
+from custom.kinematics import SKID
 import ports
 
 class SkidDrive(BaseDrive):
     '''A drive base where all wheels on each side move together.'''
 
+    kinematics = SKID
+
 
     def _configureMotors(self):
 
@@ -23,7 +26,3 @@ class SkidDrive(BaseDrive):
         '''Invert encoders'''
         for motor in self.activeMotors:
             motor.setSensorPhase(True)
-
-
-    def _calculateSpeeds(self, x, y, rotate):
-        return [y + rotate, -y + rotate]
@@ -0,0 +1,153 @@
+from wpilib.command import Subsystem
+from wpilib import Timer
+
+import math, threading
+
+from ctre import ControlMode
+
+from custom import telemetrylog
+from custom.config import Config
+from custom.logs import getLogPath
+from custom.sensorsnapshot import SensorSnapshot
+import robot
+
+
+class Telemetry(Subsystem):
+    '''
+    Records drive train and navX readings every loop, for tuning and debugging
+    after a match. Set Robot/telemetry to true in Config and restart the robot
+    program to turn it on.
+
+    Samples are written into a preallocated ring buffer of fixed size rows, so
+    recording does not allocate memory. A background thread copies finished
+    rows to disk in the columnar format described in custom.telemetrylog.
+    '''
+
+    '''How many rows the ring buffer holds. At 50 rows a second, about 20 s.'''
+    capacity = 1024
+
+    '''How often, in seconds, the background thread writes to disk.'''
+    flushPeriod = 0.5
+
+    '''The sensor readings each row is made from.'''
+    motorFields = (
+        SensorSnapshot.POSITION,
+        SensorSnapshot.VELOCITY,
+        SensorSnapshot.TARGET,
+        SensorSnapshot.OUTPUT,
+    )
+    gyroFields = (
+        SensorSnapshot.ANGLE,
+        SensorSnapshot.PITCH,
+        SensorSnapshot.ACCELERATION,
+    )
+
+    positionModes = (ControlMode.Position, ControlMode.MotionMagic)
+
+    def __init__(self):
+        super().__init__('Telemetry')
+
+        self.enabled = Config('Robot/telemetry', False).b
+        self.columns = None
+        self.head = 0
+        self.tail = 0
+        self.droppedRows = 0
+
+
+    def periodic(self):
+        if not self.enabled:
+            return
+
+        drivetrain = robot.drivetrain
+        sensors = drivetrain.sensors
+        if self.columns is None:
+            self._start(len(drivetrain.activeMotors))
+
+        for field in self.motorFields:
+            sensors.readMotors(field)
+
+        for field in self.gyroFields:
+            sensors.readGyro(field)
+
+        values = sensors.values
+        view = self.view
+        row = (self.head % self.capacity) * self.rowSize
+
+        view[row] = Timer.getFPGATimestamp()
+        row += 1
+        offset = 0
+        for mode in drivetrain.outputs.modes:
+            position = values[offset + sensors.POSITION]
+            velocity = values[offset + sensors.VELOCITY]
+            view[row] = position
+            view[row + 1] = velocity
+
+            '''The target is a speed or a position, depending on the mode.'''
+            if mode == ControlMode.Velocity:
+                view[row + 2] = values[offset + sensors.TARGET] - velocity
+            elif mode in self.positionModes:
+                view[row + 2] = values[offset + sensors.TARGET] - position
+            else:
+                view[row + 2] = math.nan
+
+            view[row + 3] = values[offset + sensors.OUTPUT]
+            row += 4
+            offset += sensors.motorFields
+
+        gyro = sensors.gyroOffset
+        view[row] = values[gyro + sensors.ANGLE]
+        view[row + 1] = values[gyro + sensors.PITCH]
+        view[row + 2] = values[gyro + sensors.ACCELERATION]
+
+        self.head += 1
+
+
+    def _start(self, motorCount):
+        '''Allocate the ring buffer and start writing the log.'''
+
+        self.columns = telemetrylog.getColumns(motorCount)
+        self.rowSize = len(self.columns)
+        self.buffer = bytearray(
+            self.capacity * self.rowSize * telemetrylog.valueSize
+        )
+        self.view = memoryview(self.buffer).cast('d')
+
+        self.logFile = open(getLogPath('telemetry', 'bin'), 'wb')
+        telemetrylog.writeHeader(self.logFile, self.columns)
+
+        writer = threading.Thread(target=self._writeLoop, daemon=True)
+        writer.start()
+
+
+    def _writeLoop(self):
+        '''Runs on the background thread, writing new rows to disk.'''
+
+        wait = threading.Event().wait
+        while True:
+            wait(self.flushPeriod)
+
+            head = self.head
+            if head - self.tail > self.capacity:
+                '''We fell behind, so the oldest rows were overwritten.'''
+                self.droppedRows += head - self.capacity - self.tail
+                self.tail = head - self.capacity
+
+            '''The rows may wrap around the end of the buffer.'''
+            while self.tail < head:
+                start = self.tail % self.capacity
+                end = min(start + head - self.tail, self.capacity)
+                self._writeBlock(start, end)
+                self.tail += end - start
+
+            self.logFile.flush()
+
+
+    def _writeBlock(self, start, end):
+        '''Write rows start through end - 1 of the buffer, column by column.'''
+
+        size = self.rowSize
+        self.logFile.write(telemetrylog.blockHeader.pack(end - start))
+        for column in range(size):
+            self.logFile.write(
+                self.view[start * size + column:end * size:size].tobytes()
+            )
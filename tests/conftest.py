@@ -0,0 +1,50 @@
+'''
+Shared fixtures. Tests can be run with python -m pytest from the repository.
+'''
+
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def sim():
+    '''
+    The simulated robot. Only one can be created per process, so every test
+    that needs it shares this one.
+    '''
+
+    pytest.importorskip('wpilib')
+    pytest.importorskip('ctre')
+    pytest.importorskip('navx')
+
+    from sim.harness import SimulatedRobot
+
+    return SimulatedRobot()
+
+
+@pytest.fixture
+def setConfig():
+    '''
+    Change Config values for one test. The values in place before the test
+    are restored afterwards, and nothing is saved to the snapshot file.
+    '''
+
+    pytest.importorskip('networktables')
+
+    from custom import config
+
+    config.snapshotPath = None
+    changed = {}
+
+    def store(key, value):
+        entry = config.Config(key)
+        changed.setdefault(entry.key, entry.getValue())
+        config.Config._store(entry.key, value)
+
+    yield store
+
+    for key, value in changed.items():
+        config.Config._store(key, value)
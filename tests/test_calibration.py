@@ -0,0 +1,38 @@
+import math, random
+
+import pytest
+
+pytest.importorskip('networktables')
+
+from custom.calibration import RecursiveLeastSquares
+
+
+def test_fits_slope():
+    random.seed(1)
+    estimate = RecursiveLeastSquares(1.0, 10)
+
+    for sample in range(200):
+        x = random.uniform(-5, 5)
+        estimate.update(x, 1.3 * x + random.gauss(0, 0.01))
+
+    assert estimate.theta == pytest.approx(1.3, rel=0.001)
+    assert estimate.samples == 200
+    assert estimate.getRelativeError() < 0.01
+
+
+def test_follows_slow_changes():
+    estimate = RecursiveLeastSquares(1.0, 10, forgetting=0.95)
+
+    for sample in range(100):
+        estimate.update(1.0, 2.0)
+
+    for sample in range(100):
+        estimate.update(1.0, 3.0)
+
+    assert estimate.theta == pytest.approx(3.0, rel=0.01)
+
+
+def test_no_estimate_has_infinite_error():
+    estimate = RecursiveLeastSquares(0.0, 10)
+
+    assert estimate.getRelativeError() == math.inf
@@ -0,0 +1,26 @@
+def test_traces_command_groups(sim):
+    '''
+    CommandGroup replaces the shadow methods that tracing wraps on Command, so
+    make sure both the group and the commands it runs are counted.
+    '''
+
+    from wpilib.command import CommandGroup
+
+    from commands.drivetrain.movecommand import MoveCommand
+    from custom import commandtrace
+
+    commandtrace.enable(sim.module.drivetrain.outputs)
+
+    move = MoveCommand(6, False)
+    group = CommandGroup('Traced Group')
+    group.addSequential(move)
+    group.start()
+    for i in range(50):
+        sim.tick()
+
+    groupStats = commandtrace.getStats(group.getName())
+    assert groupStats.starts == 1
+    assert commandtrace.getStats(move.getName()).starts == 1
+
+    starts, interrupts, average, longest, frames = groupStats.getSummary()
+    assert longest >= average
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip('networktables')
+
+from custom.config import Config
+from custom.derivedvalue import DerivedValue
+
+
+def test_same_key_shares_a_slot(setConfig):
+    first = Config('Test/shared', 1)
+    second = Config('/Test/shared', 2)
+
+    assert first.slot == second.slot
+    assert second.getValue() == 1
+
+
+def test_typed_values(setConfig):
+    value = Config('Test/typed', 0)
+    setConfig('Test/typed', 2.7)
+
+    assert value.f == 2.7
+    assert value.i == 2
+    assert value.b is True
+
+    setConfig('Test/typed', 'not a number')
+    assert value.f == 0.0
+    assert value.i == 0
+
+
+def test_keys_without_a_table_go_in_config(setConfig):
+    assert Config('untabled').getKey() == 'Config/untabled'
+
+
+def test_versions_count_changes(setConfig):
+    value = Config('Test/versioned', 1)
+    other = Config('Test/unrelated', 1)
+    version = value.getVersion()
+    otherVersion = other.getVersion()
+    globalVersion = Config.version
+
+    setConfig('Test/versioned', 2)
+
+    assert value.getVersion() == version + 1
+    assert other.getVersion() == otherVersion
+    assert Config.version == globalVersion + 1
+
+
+def test_derived_value_recalculates_on_change(setConfig):
+    calls = []
+
+    def double(value):
+        calls.append(value)
+        return value * 2
+
+    derived = DerivedValue(double, Config('Test/derived', 3))
+
+    assert derived.get() == 6
+    assert derived.get() == 6
+    assert len(calls) == 1
+
+    setConfig('Test/unrelated', 5)
+    assert derived.get() == 6
+    assert len(calls) == 1
+
+    setConfig('Test/derived', 4)
+    assert derived.get() == 8
+    assert len(calls) == 2
+
+
+def test_derived_value_stays_stale_after_failure(setConfig):
+    derived = DerivedValue(lambda value: 1 / value, Config('Test/divisor', 0))
+
+    with pytest.raises(ZeroDivisionError):
+        derived.get()
+
+    setConfig('Test/divisor', 4)
+    assert derived.get() == 0.25
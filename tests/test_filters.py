@@ -0,0 +1,44 @@
+import pytest
+
+from controller.filters import Deadband, DirectionLockout, Expo, SlewRateLimiter
+
+
+def test_deadband_rescales():
+    deadband = Deadband(0.1)
+
+    assert deadband(0.05, 0.02) == 0.0
+    assert deadband(-0.09, 0.02) == 0.0
+    assert deadband(1.0, 0.02) == 1.0
+    assert deadband(-1.0, 0.02) == -1.0
+    assert deadband(0.55, 0.02) == pytest.approx(0.5)
+
+
+def test_expo_keeps_the_ends():
+    expo = Expo(0.3)
+
+    assert expo(0.0, 0.02) == 0.0
+    assert expo(1.0, 0.02) == pytest.approx(1.0)
+    assert expo(-1.0, 0.02) == pytest.approx(-1.0)
+    assert 0 < expo(0.5, 0.02) < 0.5
+
+
+def test_slew_rate_limits_each_loop():
+    limiter = SlewRateLimiter(2)
+
+    assert limiter(1.0, 0.1) == pytest.approx(0.2)
+    assert limiter(1.0, 0.1) == pytest.approx(0.4)
+    assert limiter(-1.0, 0.1) == pytest.approx(0.2)
+    assert limiter(0.2, 1.0) == pytest.approx(0.2)
+
+
+def test_direction_lockout_blocks_reversal_until_it_decays():
+    lockout = DirectionLockout(decay=2.5)
+
+    assert lockout(1.0, 0.02) == 1.0
+    assert lockout(-1.0, 0.02) == 0.0
+
+    '''After 0.4 s the memory of full forward has decayed to zero.'''
+    for i in range(20):
+        lockout(0.0, 0.02)
+
+    assert lockout(-1.0, 0.02) == -1.0
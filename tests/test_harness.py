@@ -0,0 +1,24 @@
+def test_loop_runs(sim):
+    '''Drive forward for a few loops and make sure the wheels turned.'''
+
+    sim.setAxes(
+        driveX=lambda t: 0,
+        driveY=lambda t: 1,
+        driveRotate=lambda t: 0
+    )
+
+    start = sim.module.drivetrain.getPositions()
+    for i in range(25):
+        assert sim.tick() >= 0
+
+    sim.module.drivetrain.invalidateSensors()
+    positions = sim.module.drivetrain.getPositions()
+    assert any(new != old for new, old in zip(positions, start))
+
+    sim.setAxes(
+        driveX=lambda t: 0,
+        driveY=lambda t: 0,
+        driveRotate=lambda t: 0
+    )
+    for i in range(25):
+        sim.tick()
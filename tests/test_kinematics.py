@@ -0,0 +1,31 @@
+import pytest
+
+from custom import kinematics
+
+
+@pytest.mark.parametrize('drive', [kinematics.MECANUM, kinematics.SKID])
+def test_round_trip(drive):
+    '''Chassis speeds a drive can make come back from its wheel speeds.'''
+
+    x = 0.3 if drive is kinematics.MECANUM else 0.0
+    wheels = drive.toWheelSpeeds(x, -0.5, 0.2)
+
+    assert drive.toChassisSpeeds(wheels) == pytest.approx([x, -0.5, 0.2])
+
+
+def test_skid_cannot_strafe():
+    wheels = kinematics.SKID.toWheelSpeeds(1.0, 0.0, 0.0)
+
+    assert wheels == [0.0, 0.0]
+    assert kinematics.SKID.toChassisSpeeds([1.0, 1.0])[0] == 0.0
+
+
+def test_field_oriented_rotates_by_heading():
+    x, y = kinematics.fieldOriented(0.0, 1.0, 90)
+
+    assert (x, y) == pytest.approx((-1.0, 0.0))
+
+
+def test_normalize_keeps_ratio():
+    assert kinematics.normalize([0.5, -0.25]) == [0.5, -0.25]
+    assert kinematics.normalize([2.0, -1.0]) == pytest.approx([1.0, -0.5])
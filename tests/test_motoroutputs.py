@@ -0,0 +1,111 @@
+import pytest
+
+pytest.importorskip('networktables')
+ctre = pytest.importorskip('ctre')
+
+from custom.motoroutputs import MotorOutputCache
+
+ControlMode = ctre.ControlMode
+
+
+class RecordingMotor:
+    '''Remembers every frame that would have been sent.'''
+
+    def __init__(self):
+        self.frames = []
+
+
+    def set(self, mode, value):
+        self.frames.append((mode, value))
+
+
+    def setIntegralAccumulator(self, value, pidIdx, timeout):
+        self.frames.append(('clear', value))
+
+
+def makeCache(count=2):
+    motors = [RecordingMotor() for i in range(count)]
+
+    return MotorOutputCache(motors), motors
+
+
+def test_repeated_setpoints_are_sent_once():
+    cache, motors = makeCache()
+
+    for loop in range(3):
+        cache.set(0, ControlMode.Velocity, 100)
+        cache.set(1, ControlMode.Velocity, -100)
+        cache.flush()
+
+    assert motors[0].frames == [(ControlMode.Velocity, 100)]
+    assert motors[1].frames == [(ControlMode.Velocity, -100)]
+    assert cache.sentFrames == 2
+    assert cache.suppressedFrames == 4
+
+
+def test_changes_below_resolution_are_suppressed():
+    cache, motors = makeCache(1)
+
+    cache.set(0, ControlMode.PercentOutput, 0.5)
+    cache.flush()
+    cache.set(0, ControlMode.PercentOutput, 0.5 + 1e-6)
+    cache.flush()
+
+    assert len(motors[0].frames) == 1
+
+
+def test_mode_change_is_sent():
+    cache, motors = makeCache(1)
+
+    cache.set(0, ControlMode.Velocity, 0)
+    cache.flush()
+    cache.set(0, ControlMode.PercentOutput, 0)
+    cache.flush()
+
+    assert [mode for mode, value in motors[0].frames] == [
+        ControlMode.Velocity,
+        ControlMode.PercentOutput,
+    ]
+
+
+def test_only_last_staged_value_is_sent():
+    cache, motors = makeCache(1)
+
+    cache.set(0, ControlMode.Velocity, 10)
+    cache.set(0, ControlMode.Velocity, 20)
+    assert cache.getFrameCount() == 1
+
+    cache.flush()
+    assert motors[0].frames == [(ControlMode.Velocity, 20)]
+
+
+def test_integral_is_cleared_once_until_driven():
+    cache, motors = makeCache(1)
+
+    cache.clearIntegral(0)
+    cache.flush()
+    cache.clearIntegral(0)
+    cache.flush()
+    assert motors[0].frames == [('clear', 0)]
+
+    cache.set(0, ControlMode.Velocity, 50)
+    cache.flush()
+    cache.clearIntegral(0)
+    cache.flush()
+    assert motors[0].frames == [
+        ('clear', 0),
+        (ControlMode.Velocity, 50),
+        ('clear', 0),
+    ]
+
+
+def test_invalidate_resends():
+    cache, motors = makeCache(1)
+
+    cache.set(0, ControlMode.Velocity, 10)
+    cache.flush()
+    cache.invalidate()
+    cache.set(0, ControlMode.Velocity, 10)
+    cache.flush()
+
+    assert len(motors[0].frames) == 2
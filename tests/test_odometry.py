@@ -0,0 +1,64 @@
+import pytest
+
+
+def test_integrates_encoder_travel(sim):
+    '''Driving straight ahead moves the pose forward by the encoder distance.'''
+
+    drivetrain = sim.module.drivetrain
+    odometry = sim.module.odometry
+
+    sim.setAxes(
+        driveX=lambda t: 0,
+        driveY=lambda t: 0,
+        driveRotate=lambda t: 0
+    )
+    sim.tick()
+
+    drivetrain.invalidateSensors()
+    start = drivetrain.getPositions()
+    x, y, heading = odometry.getPose()
+
+    sim.setAxes(driveY=lambda t: 0.5)
+    for loop in range(25):
+        sim.tick()
+
+    sim.setAxes(driveY=lambda t: 0)
+    for loop in range(10):
+        sim.tick()
+
+    '''Odometry runs before the hardware moves, so count one more loop.'''
+    sim.module.drivetrain.invalidateSensors()
+    odometry.periodic()
+
+    deltas = [
+        new - old for new, old in zip(drivetrain.getPositions(), start)
+    ]
+    forward = drivetrain.kinematics.toChassisSpeeds(deltas)[1]
+    travelled = forward / drivetrain.ticksPerInch.get()
+    assert travelled > 1
+
+    newX, newY, newHeading = odometry.getPose()
+    assert newY - y == pytest.approx(travelled, rel=0.01)
+    assert newX - x == pytest.approx(0, abs=0.01)
+    assert newHeading == heading
+
+
+def test_reset_keeps_history(sim):
+    odometry = sim.module.odometry
+
+    sim.setAxes(driveY=lambda t: 0.5)
+    for loop in range(10):
+        sim.tick()
+
+    sim.setAxes(driveY=lambda t: 0)
+    count = odometry.count
+    past = sim.clock.now() - 0.1
+    x, y, heading = odometry.getPoseAt(past)
+    currentX, currentY, currentHeading = odometry.getPose()
+
+    odometry.resetPose(0, 0)
+
+    assert odometry.count == count
+    shiftedX, shiftedY, shiftedHeading = odometry.getPoseAt(past)
+    assert shiftedY == pytest.approx(y - currentY)
+    assert shiftedX == pytest.approx(x - currentX)
@@ -0,0 +1,63 @@
+import math
+
+import pytest
+
+
+@pytest.fixture
+def RangeFilter(sim):
+    '''The subsystem module imports the robot, so it needs the simulator.'''
+
+    from subsystems.rangesensors import RangeFilter
+
+    return RangeFilter
+
+
+def makeFilter(RangeFilter, readings):
+    readings = iter(readings)
+
+    return RangeFilter(lambda: next(readings))
+
+
+def test_median_rejects_single_echo(RangeFilter):
+    rangeFilter = makeFilter(RangeFilter, [40, 40, 5, 40, 40])
+
+    for loop in range(5):
+        rangeFilter.sample(loop * 0.02)
+
+    assert rangeFilter.clearance == pytest.approx(40)
+
+
+def test_closing_speed(RangeFilter):
+    '''Approach at 20 inches per second.'''
+
+    rangeFilter = makeFilter(RangeFilter, [100 - 0.4 * i for i in range(100)])
+
+    for loop in range(100):
+        rangeFilter.sample(loop * 0.02)
+
+    assert rangeFilter.closingSpeed == pytest.approx(20, rel=0.05)
+
+
+def test_infinite_readings_do_not_give_nan(RangeFilter):
+    readings = [math.inf] * 5 + [30] * 5 + [math.inf] * 5
+    rangeFilter = makeFilter(RangeFilter, readings)
+
+    for loop in range(len(readings)):
+        rangeFilter.sample(loop * 0.02)
+        assert not math.isnan(rangeFilter.clearance)
+        assert not math.isnan(rangeFilter.closingSpeed)
+
+        if loop == 9:
+            assert rangeFilter.clearance == pytest.approx(30)
+
+    assert rangeFilter.clearance == math.inf
+    assert rangeFilter.closingSpeed == 0.0
+
+
+def test_same_time_is_ignored(RangeFilter):
+    rangeFilter = makeFilter(RangeFilter, [50, 10])
+
+    rangeFilter.sample(1.0)
+    rangeFilter.sample(1.0)
+
+    assert rangeFilter.clearance == 50
@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip('networktables')
+
+from custom.settledetector import SettleDetector
+
+
+def test_settles_after_confirmations(setConfig):
+    setConfig('DriveTrain/blendTime', 0)
+    detector = SettleDetector()
+
+    assert not detector.update([1000], [995], [0], 10)
+    assert detector.update([1000], [995], [0], 10)
+
+
+def test_moving_or_far_away_is_not_settled(setConfig):
+    setConfig('DriveTrain/blendTime', 0)
+    detector = SettleDetector()
+
+    '''Within tolerance, but still moving faster than tolerance per second.'''
+    for loop in range(3):
+        assert not detector.update([1000], [995], [5], 10)
+
+    for loop in range(3):
+        assert not detector.update([1000], [900], [0], 10)
+
+
+def test_any_motor_resets_the_count(setConfig):
+    setConfig('DriveTrain/blendTime', 0)
+    detector = SettleDetector()
+
+    detector.update([0, 0], [0, 0], [0, 0], 10)
+    assert not detector.update([0, 0], [0, 50], [0, 0], 10)
+    assert not detector.update([0, 0], [0, 0], [0, 0], 10)
+    assert detector.update([0, 0], [0, 0], [0, 0], 10)
+
+
+def test_blends_when_arriving_soon(setConfig):
+    setConfig('DriveTrain/blendTime', 0.2)
+    detector = SettleDetector()
+
+    '''100 ticks away at 100 ticks per 100 ms arrives in 0.1 s.'''
+    detector.update([1000], [900], [100], 10)
+    assert detector.update([1000], [900], [100], 10)
+
+    '''Moving away from the target never counts.'''
+    detector.reset()
+    for loop in range(3):
+        assert not detector.update([1000], [900], [-100], 10)
+
+    '''Too far to arrive within the blend time.'''
+    detector.reset()
+    for loop in range(3):
+        assert not detector.update([1000], [500], [100], 10)
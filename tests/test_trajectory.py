@@ -0,0 +1,57 @@
+import pytest
+
+from custom import trajectory
+
+
+def test_straight_path_respects_limits():
+    '''A straight path is a trapezoid that starts and ends at rest.'''
+
+    path = trajectory.generate([(0, 0, 0), (0, 120, 0)], 60, 120, 26)
+
+    assert path.velocities[0] == 0.0
+    assert path.velocities[-1] == 0.0
+    assert max(path.velocities) <= 60 + 1e-9
+    assert max(path.velocities) == pytest.approx(60, rel=0.01)
+    assert all(curvature == 0 for curvature in path.curvatures)
+
+    '''Half a second each to speed up and slow down, then cruise.'''
+    assert path.getDuration() == pytest.approx(2.5, abs=0.05)
+
+    distance = sum(path.velocities) * path.period
+    assert distance == pytest.approx(120, rel=0.02)
+
+
+def test_accelerates_within_limit():
+    path = trajectory.generate([(0, 0, 0), (24, 60, 0)], 60, 120, 26)
+
+    for before, after in zip(path.velocities, path.velocities[1:]):
+        assert abs(after - before) <= 120 * path.period * 1.05
+
+
+def test_curve_slows_and_turns():
+    path = trajectory.generate([(0, 0, 0), (60, 60, 90)], 60, 120, 26)
+
+    assert path.headings[0] == 0
+    assert path.headings[-1] == pytest.approx(90, abs=1)
+    assert max(path.velocities) < 60
+
+
+def test_needs_two_waypoints():
+    with pytest.raises(ValueError):
+        trajectory.generate([(0, 0, 0)], 60, 120, 26)
+
+
+def test_load_caches_plans(tmp_path, monkeypatch):
+    monkeypatch.setattr(trajectory, 'cacheDirectory', str(tmp_path))
+    monkeypatch.setattr(trajectory, 'loaded', {})
+
+    waypoints = [(0, 0, 0), (24, 60, 0)]
+    first = trajectory.load(waypoints, 60, 120, 26)
+    assert trajectory.load(waypoints, 60, 120, 26) is first
+    assert len(list(tmp_path.iterdir())) == 1
+
+    '''A new program loads the saved plan from disk.'''
+    monkeypatch.setattr(trajectory, 'loaded', {})
+    saved = trajectory.load(waypoints, 60, 120, 26)
+    assert saved is not first
+    assert saved.velocities == first.velocities